@@ -0,0 +1,22 @@
+"""
+Optional Numba JIT support.
+
+Numba is an optional dependency (the `numba` extra). When it is missing,
+`njit` is a pass-through decorator so kernels still import and run as
+plain Python; callers that would be slow without compilation check
+HAS_NUMBA and take a NumPy path instead.
+"""
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
@@ -6,9 +6,10 @@ matrix C that makes the observed matchings optimal under OT.
 """
 
 import numpy as np
-import ot
 from scipy.optimize import minimize
 
+from .solver import batched_sinkhorn_kernel
+
 
 def build_observed_plan(
     matchings: list[dict],
@@ -26,10 +27,14 @@ def build_observed_plan(
     Returns:
         N×M transport plan matrix
     """
+    count = len(matchings)
+    rows = np.fromiter((m["event_idx"] for m in matchings), dtype=np.intp, count=count)
+    cols = np.fromiter((m["venue_idx"] for m in matchings), dtype=np.intp, count=count)
+    success = np.fromiter((m["success"] for m in matchings), dtype=bool, count=count)
+
+    # Single scatter-add; repeated (event, venue) pairs accumulate
     T = np.zeros((n_events, n_venues))
-    for m in matchings:
-        weight = 1.0 if m["success"] else 0.1
-        T[m["event_idx"], m["venue_idx"]] += weight
+    np.add.at(T, (rows, cols), np.where(success, 1.0, 0.1))
 
     # Normalize rows
     row_sums = T.sum(axis=1, keepdims=True)
@@ -52,10 +57,7 @@ def build_weighted_cost(
     Returns:
         (N, M) weighted cost matrix
     """
-    C = np.zeros_like(cost_components[0])
-    for w, comp in zip(weights, cost_components):
-        C += w * comp
-    return C
+    return np.tensordot(weights, np.asarray(cost_components), axes=1)
 
 
 def learn_cost_weights(
@@ -67,8 +69,13 @@ def learn_cost_weights(
     initial_weights: np.ndarray | None = None,
 ) -> dict:
     """
-    Learn optimal cost weights from observed matchings via gradient-free
-    optimization (L-BFGS-B).
+    Learn optimal cost weights from observed matchings via L-BFGS-B.
+
+    Each objective call solves Sinkhorn once; the gradient of the loss with
+    respect to the weights is analytic (implicit differentiation of the
+    entropic plan, see _entropic_plan_cost_grad), so L-BFGS-B needs no
+    extra solves for finite differences. Successive solves are warm-started
+    from the previous call's scalings, since L-BFGS-B probes nearby weights.
 
     Args:
         matchings: Historical matchings
@@ -88,31 +95,57 @@ def learn_cost_weights(
     # Build observed plan
     T_obs = build_observed_plan(matchings, n_events, n_venues)
 
+    # Components, and log-kernel components -A_k/reg, are invariant across
+    # L-BFGS iterations, so log K(w) = sum_k w_k * (-A_k/reg) is one GEMM
+    components = np.stack(cost_components, axis=0).reshape(K, -1)
+    log_kernels = components / -reg
+    kernel_buf = np.empty((1, n_events * n_venues))
+
     # Marginals
     a = np.ones(n_events) / n_events
     b = np.ones(n_venues) / n_venues
 
-    def objective(w: np.ndarray) -> float:
+    # Log scalings of the last solve, reused as the next starting point
+    warmstart = None
+
+    def objective(w: np.ndarray) -> tuple[float, np.ndarray]:
+        nonlocal warmstart
+
         # Project to positive and normalize
         w_pos = np.maximum(w, 0.01)
         w_norm = w_pos / w_pos.sum()
 
-        # Build cost matrix
-        C = build_weighted_cost(w_norm, cost_components)
-
-        # Solve Sinkhorn
-        try:
-            T_pred = ot.sinkhorn(a, b, C, reg=reg, numItermax=200)
-        except Exception:
-            return 1e10
+        # Build the kernel in place and solve Sinkhorn once
+        np.matmul(w_norm, log_kernels, out=kernel_buf[0])
+        np.exp(kernel_buf, out=kernel_buf)
+        kernel = kernel_buf.reshape(1, n_events, n_venues)
+        plans, log = batched_sinkhorn_kernel(
+            a, b, kernel, n_iter=200, warmstart=warmstart, log=True
+        )
+        T_pred = plans[0]
 
         # Frobenius loss
-        return float(np.sum((T_pred - T_obs) ** 2))
+        resid = T_pred - T_obs
+        loss = float(np.sum(resid ** 2))
+        if not np.isfinite(loss):
+            warmstart = None
+            return 1e10, np.zeros(K)
+        with np.errstate(divide="ignore"):
+            warmstart = (np.log(log["u"]), np.log(log["v"]))
+
+        # Chain rule through C(w) = sum_k w_norm_k A_k with w_norm = w_pos / sum
+        dL_dC = _entropic_plan_cost_grad(T_pred, 2.0 * resid, a, b, reg).ravel()
+        C = w_norm @ components
+        grad = (components @ dL_dC - C @ dL_dC) / w_pos.sum()
+        grad[w < 0.01] = 0.0
+        grad[~np.isfinite(grad)] = 0.0
+        return loss, grad
 
     result = minimize(
         objective,
         initial_weights,
         method="L-BFGS-B",
+        jac=True,
         bounds=[(0.01, 1.0)] * K,
         options={"maxiter": 200},
     )
@@ -127,3 +160,42 @@ def learn_cost_weights(
         "n_iterations": int(result.nit),
         "converged": result.success,
     }
+
+
+def _entropic_plan_cost_grad(
+    T: np.ndarray,
+    G: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    reg: float,
+) -> np.ndarray:
+    """
+    Gradient dL/dC of a loss L(T) through the entropic OT plan T(C).
+
+    T = exp((f ⊕ g - C) / reg) with marginals a, b. Differentiating the
+    marginal constraints gives a linear system for the potentials; its
+    adjoint [diag(a) T; Tᵀ diag(b)] [x; y] = [H1; Hᵀ1] with H = G ⊙ T
+    yields dL/dC = (T ⊙ (x ⊕ y) - H) / reg. x is eliminated, leaving an
+    M×M Schur complement (singular along the constant shift of f and g,
+    hence least squares).
+
+    Args:
+        T: (N, M) converged transport plan
+        G: (N, M) gradient dL/dT
+        a: Source marginal (N,)
+        b: Target marginal (M,)
+        reg: Entropic regularization
+
+    Returns:
+        (N, M) gradient dL/dC
+    """
+    H = G * T
+    h_row = H.sum(axis=1)
+    h_col = H.sum(axis=0)
+
+    schur = np.diag(b) - T.T @ (T / a[:, None])
+    rhs = h_col - T.T @ (h_row / a)
+    y = np.linalg.lstsq(schur, rhs, rcond=None)[0]
+    x = (h_row - T @ y) / a
+
+    return (T * (x[:, None] + y[None, :]) - H) / reg
@@ -1,43 +1,553 @@
 """
-POT-based Sinkhorn solver for large-scale problems.
+Sinkhorn solvers for large-scale problems.
 
-Uses the Python Optimal Transport (POT) library for batch processing
-that exceeds browser capabilities.
+Balanced OT on a materialized cost matrix uses POT's kernel-domain
+Sinkhorn (two matrix-vector products per iteration), falling back to a
+tiled log-domain Sinkhorn when the kernel exp(-C/reg) underflows. The
+log-domain solver also serves point clouds, whose cost tiles it recomputes
+instead of storing. Unbalanced and partial OT use the Python Optimal
+Transport (POT) library for batch processing that exceeds browser
+capabilities.
 """
 
+import warnings
+
 import numpy as np
 import ot
 
+from ..jit import HAS_NUMBA, njit
+
+# Problems up to this many cells use the fused Numba kernel when available;
+# beyond roughly 80×80, NumPy's vectorized exp over row tiles wins
+SMALL_PROBLEM_SIZE = 80 * 80
+
+# Fast-math without the no-NaN/no-Inf assumptions: zero-mass marginals
+# legitimately produce -inf potentials
+_FASTMATH = {"contract", "arcp", "reassoc", "afn", "nsz"}
+
 
 def sinkhorn_solve(
     a: np.ndarray,
     b: np.ndarray,
-    C: np.ndarray,
+    C: np.ndarray | None = None,
     reg: float = 0.01,
     max_iter: int = 1000,
+    X: np.ndarray | None = None,
+    Y: np.ndarray | None = None,
+    half_cost: bool = False,
+    tol: float = 1e-9,
+    tile_size: int = 256,
+    method: str = "sinkhorn",
 ) -> dict:
     """
-    Solve an OT problem using POT's Sinkhorn implementation.
+    Solve a balanced OT problem with Sinkhorn.
+
+    A materialized cost C goes to POT's kernel-domain Sinkhorn: with C in
+    memory, two matrix-vector products per iteration beat any log-domain
+    sweep, which needs an exp per cell and half-iteration. If the kernel
+    exp(-C/reg) underflows (small reg relative to the costs), the solve is
+    redone in the log domain.
+
+    The log-domain solver is tiled (FlashSinkhorn-style): the kernel is never
+    formed, and each iteration streams row tiles of the cost, updating the
+    dual potentials with a fused, max-shifted logsumexp. When point clouds
+    X, Y are given instead of C, cost tiles are recomputed on the fly so the
+    N×M cost is never stored.
+
+    For small cost matrices (N·M ≤ SMALL_PROBLEM_SIZE) the same iteration
+    runs as a single Numba kernel when Numba is installed, removing the
+    per-iteration NumPy dispatch and temporaries that dominate there.
+
+    method='acc_sinkhorn' uses Nesterov-accelerated log-domain Sinkhorn with
+    adaptive restart, which needs far fewer iterations in the small-reg
+    regime.
 
     Args:
         a: Source distribution (N,)
         b: Target distribution (M,)
-        C: Cost matrix (N, M)
+        C: Cost matrix (N, M). Optional if X and Y are given.
         reg: Entropic regularization (epsilon)
         max_iter: Maximum Sinkhorn iterations
+        X: Source point cloud (N, D), used when C is None
+        Y: Target point cloud (M, D), used when C is None
+        half_cost: Use ||x - y||² / 2 instead of ||x - y||² for point clouds
+        tol: Stop when the L1 row-marginal error drops below this
+        tile_size: Rows of the cost processed per block
+        method: 'sinkhorn' or 'acc_sinkhorn'
 
     Returns:
         dict with keys: plan, cost, converged
     """
-    T = ot.sinkhorn(a, b, C, reg=reg, numItermax=max_iter)
-    cost = float(np.sum(T * C))
+    if C is not None:
+        n, m = C.shape
+        dtype = np.result_type(C, np.float32)
+
+        def cost_tile(i0: int, i1: int) -> np.ndarray:
+            return C[i0:i1]
+    elif X is not None and Y is not None:
+        n, m = X.shape[0], Y.shape[0]
+        dtype = np.result_type(X, Y, np.float32)
+        y_sq = np.einsum("ij,ij->i", Y, Y)
+
+        def cost_tile(i0: int, i1: int) -> np.ndarray:
+            return _sqeuclidean_tile(X[i0:i1], Y, y_sq, half_cost)
+    else:
+        raise ValueError("sinkhorn_solve needs either C or both X and Y")
+
+    if method == "acc_sinkhorn":
+        f, g, converged = _acc_log_sinkhorn_tiled(
+            a, b, cost_tile, n, m, reg, max_iter, tol, tile_size, dtype
+        )
+    elif method != "sinkhorn":
+        raise ValueError(f"Unknown Sinkhorn method: {method}")
+    elif C is not None and HAS_NUMBA and n * m <= SMALL_PROBLEM_SIZE:
+        f, g, converged = _log_sinkhorn_small(
+            np.ascontiguousarray(a, dtype=np.float64),
+            np.ascontiguousarray(b, dtype=np.float64),
+            np.ascontiguousarray(C, dtype=np.float64),
+            reg, max_iter, _marginal_tol(tol, dtype),
+        )
+    elif C is not None and (
+        result := _kernel_sinkhorn(a, b, C, reg, max_iter, _marginal_tol(tol, dtype))
+    ) is not None:
+        return result
+    else:
+        f, g, converged = _log_sinkhorn_tiled(
+            a, b, cost_tile, n, m, reg, max_iter, tol, tile_size, dtype
+        )
+
+    T = np.empty((n, m), dtype=dtype)
+    cost = 0.0
+    for i0 in range(0, n, tile_size):
+        i1 = min(i0 + tile_size, n)
+        c = cost_tile(i0, i1)
+        T[i0:i1] = np.exp((f[i0:i1, None] + g[None, :] - c) / reg)
+        cost += float(np.sum(T[i0:i1] * c))
+
     return {
-        "plan": T.tolist(),
+        "plan": T,
         "cost": cost,
-        "converged": True,
+        "converged": converged,
+    }
+
+
+def sinkhorn_lazy_solve(
+    a: np.ndarray,
+    b: np.ndarray,
+    X_s: np.ndarray,
+    X_t: np.ndarray,
+    metric: str = "sqeuclidean",
+    reg: float = 0.01,
+    max_iter: int = 1000,
+    tol: float = 1e-9,
+    batch_size: int = 256,
+) -> dict:
+    """
+    Lazy log-domain Sinkhorn between two point clouds (POT isLazy-style).
+
+    Only the dual potentials f (N,) and g (M,) are held; cost blocks of
+    batch_size source points are computed, consumed and discarded. Neither
+    the cost matrix nor the plan is ever materialized.
+
+    Args:
+        a: Source distribution (N,)
+        b: Target distribution (M,)
+        X_s: Source features (N, D)
+        X_t: Target features (M, D)
+        metric: Any scipy cdist metric ('sqeuclidean', 'euclidean', ...)
+        reg: Entropic regularization
+        max_iter: Maximum Sinkhorn iterations
+        tol: Stop when the L1 row-marginal error drops below this
+        batch_size: Source points per cost block
+
+    Returns:
+        dict with keys: f, g, cost, converged
+    """
+    from scipy.spatial.distance import cdist
+
+    n, m = X_s.shape[0], X_t.shape[0]
+    dtype = np.result_type(X_s, X_t, np.float32)
+
+    if metric == "sqeuclidean":
+        y_sq = np.einsum("ij,ij->i", X_t, X_t)
+
+        def cost_tile(i0: int, i1: int) -> np.ndarray:
+            return _sqeuclidean_tile(X_s[i0:i1], X_t, y_sq, False)
+    else:
+        def cost_tile(i0: int, i1: int) -> np.ndarray:
+            return cdist(X_s[i0:i1], X_t, metric=metric).astype(dtype, copy=False)
+
+    f, g, converged = _log_sinkhorn_tiled(
+        a, b, cost_tile, n, m, reg, max_iter, tol, batch_size, dtype
+    )
+
+    cost = 0.0
+    for i0 in range(0, n, batch_size):
+        i1 = min(i0 + batch_size, n)
+        c = cost_tile(i0, i1)
+        cost += float(np.sum(np.exp((f[i0:i1, None] + g[None, :] - c) / reg) * c))
+
+    return {
+        "f": f,
+        "g": g,
+        "cost": cost,
+        "converged": converged,
+    }
+
+
+def _kernel_sinkhorn(
+    a: np.ndarray,
+    b: np.ndarray,
+    C: np.ndarray,
+    reg: float,
+    max_iter: int,
+    tol: float,
+) -> dict | None:
+    """
+    POT's kernel-domain Sinkhorn on a materialized cost.
+
+    Returns None when the scalings hit numerical errors (POT stops early
+    without converging, or the plan is not finite), i.e. when exp(-C/reg)
+    underflowed; the caller then solves in the log domain.
+    """
+    # Underflow is handled by the caller, so POT's warnings about it are noise
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore")
+        T, log = ot.sinkhorn(
+            a, b, C, reg=reg, numItermax=max_iter, stopThr=tol, log=True, warn=False
+        )
+    converged = bool(log["err"]) and log["err"][-1] < tol
+    stopped_early = log["niter"] < max_iter - 1
+    if (stopped_early and not converged) or not np.all(np.isfinite(T)):
+        return None
+    return {
+        "plan": T,
+        "cost": float(np.sum(T * C)),
+        "converged": bool(converged),
     }
 
 
+def _sqeuclidean_tile(
+    x: np.ndarray,
+    Y: np.ndarray,
+    y_sq: np.ndarray,
+    half_cost: bool,
+) -> np.ndarray:
+    """Squared Euclidean costs between a row tile x and all of Y."""
+    c = x @ Y.T
+    c *= -2.0
+    c += np.einsum("ij,ij->i", x, x)[:, None]
+    c += y_sq[None, :]
+    np.maximum(c, 0.0, out=c)
+    if half_cost:
+        c *= 0.5
+    return c
+
+
+def _log_sinkhorn_tiled(
+    a: np.ndarray,
+    b: np.ndarray,
+    cost_tile,
+    n: int,
+    m: int,
+    reg: float,
+    max_iter: int,
+    tol: float,
+    tile_size: int,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Log-domain Sinkhorn over row tiles of the cost.
+
+    f_i = reg * (log a_i - logsumexp_j((g_j - c_ij) / reg))
+    g_j = reg * (log b_j - logsumexp_i((f_i - c_ij) / reg))
+
+    The g update combines per-tile column maxima and sums online, so only
+    one (tile_size, M) block is live at a time. Potentials and temporaries
+    are kept in dtype; max-shifting keeps every exp in range for float32.
+
+    Returns:
+        (f, g, converged)
+    """
+    with np.errstate(divide="ignore"):
+        log_a = np.log(a).astype(dtype, copy=False)
+        log_b = np.log(b).astype(dtype, copy=False)
+
+    tol = _marginal_tol(tol, dtype)
+    f = np.zeros(n, dtype=dtype)
+    g = np.zeros(m, dtype=dtype)
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        for it in range(max_iter):
+            # The row marginals of the current plan fall out of the f-update
+            f, err = _row_update(f, g, a, log_a, cost_tile, n, reg, tile_size)
+            if it > 0 and err < tol:
+                return f, g, True
+            g = _col_update(f, log_b, cost_tile, n, m, reg, tile_size, dtype)
+
+    return f, g, False
+
+
+def _acc_log_sinkhorn_tiled(
+    a: np.ndarray,
+    b: np.ndarray,
+    cost_tile,
+    n: int,
+    m: int,
+    reg: float,
+    max_iter: int,
+    tol: float,
+    tile_size: int,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Accelerated log-domain Sinkhorn (Nesterov extrapolation on f).
+
+    Each iteration extrapolates y = f_k + β_k (f_k - f_{k-1}) with
+    β_k = (k-1)/(k+2), then takes the usual g- and f-updates from y, so the
+    per-iteration cost matches _log_sinkhorn_tiled.
+
+    After an f-update the rows of the plan sum exactly to a, so the dual
+    objective is <f, a> + <g, b> - reg and costs nothing to track. If it
+    decreases, the momentum is reset and the next step is a plain Sinkhorn
+    step (adaptive restart), which keeps the iteration monotone.
+
+    Returns:
+        (f, g, converged)
+    """
+    with np.errstate(divide="ignore"):
+        log_a = np.log(a).astype(dtype, copy=False)
+        log_b = np.log(b).astype(dtype, copy=False)
+
+    tol = _marginal_tol(tol, dtype)
+    on_a = a > 0
+    on_b = b > 0
+    f = np.zeros(n, dtype=dtype)
+    f_prev = f
+    g = np.zeros(m, dtype=dtype)
+    dual = -np.inf
+    k = 0
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        for it in range(max_iter):
+            if k > 0:
+                beta = (k - 1) / (k + 2)
+                y = np.where(on_a, f + beta * (f - f_prev), f)
+            else:
+                y = f
+            g = _col_update(y, log_b, cost_tile, n, m, reg, tile_size, dtype)
+            # Error of the plan (y, g), whose columns are exact
+            f_new, err = _row_update(y, g, a, log_a, cost_tile, n, reg, tile_size)
+            if err < tol:
+                return f_new, g, True
+
+            new_dual = float(np.dot(f_new[on_a], a[on_a]) + np.dot(g[on_b], b[on_b]))
+            k = k + 1 if new_dual >= dual else 0
+            dual = new_dual
+            f_prev, f = f, f_new
+
+    return f, g, False
+
+
+def _row_update(
+    f: np.ndarray,
+    g: np.ndarray,
+    a: np.ndarray,
+    log_a: np.ndarray,
+    cost_tile,
+    n: int,
+    reg: float,
+    tile_size: int,
+) -> tuple[np.ndarray, float]:
+    """
+    f-update over row tiles.
+
+    Returns the new f and the L1 row-marginal error of the plan (f, g).
+    """
+    f_new = np.empty_like(f)
+    err = 0.0
+    for i0 in range(0, n, tile_size):
+        i1 = min(i0 + tile_size, n)
+        z = g[None, :] - cost_tile(i0, i1)
+        z /= reg
+        z_max = np.max(z, axis=1)
+        z -= z_max[:, None]
+        lse = z_max + np.log(np.sum(np.exp(z, out=z), axis=1))
+        row_mass = np.exp(f[i0:i1] / reg + lse)
+        err += float(np.sum(np.abs(row_mass - a[i0:i1])))
+        f_new[i0:i1] = reg * (log_a[i0:i1] - lse)
+    return f_new, err
+
+
+def _col_update(
+    f: np.ndarray,
+    log_b: np.ndarray,
+    cost_tile,
+    n: int,
+    m: int,
+    reg: float,
+    tile_size: int,
+    dtype: np.dtype,
+) -> np.ndarray:
+    """g-update with an online column logsumexp across row tiles."""
+    col_max = np.full(m, -np.inf, dtype=dtype)
+    col_sum = np.zeros(m, dtype=dtype)
+    for i0 in range(0, n, tile_size):
+        i1 = min(i0 + tile_size, n)
+        z = f[i0:i1, None] - cost_tile(i0, i1)
+        z /= reg
+        new_max = np.maximum(col_max, np.max(z, axis=0))
+        shift = np.where(np.isfinite(new_max), new_max, 0.0)
+        z -= shift[None, :]
+        col_sum *= np.exp(col_max - shift)
+        col_sum += np.sum(np.exp(z, out=z), axis=0)
+        col_max = new_max
+    shift = np.where(np.isfinite(col_max), col_max, 0.0)
+    return reg * (log_b - (shift + np.log(col_sum)))
+
+
+def _marginal_tol(tol: float, dtype: np.dtype) -> float:
+    """Floor a marginal-error tolerance at what dtype can resolve."""
+    return max(tol, 100 * float(np.finfo(dtype).eps))
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _log_sinkhorn_small(
+    a: np.ndarray,
+    b: np.ndarray,
+    C: np.ndarray,
+    reg: float,
+    max_iter: int,
+    tol: float,
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Log-domain Sinkhorn as one compiled loop (same updates as
+    _log_sinkhorn_tiled), for small problems held entirely in cache.
+    """
+    n, m = C.shape
+    log_a = np.log(a)
+    log_b = np.log(b)
+    f = np.zeros(n)
+    g = np.zeros(m)
+    inv_reg = 1.0 / reg
+    col_max = np.empty(m)
+    col_sum = np.empty(m)
+
+    for it in range(max_iter):
+        err = 0.0
+        for i in range(n):
+            z_max = -np.inf
+            for j in range(m):
+                z = (g[j] - C[i, j]) * inv_reg
+                if z > z_max:
+                    z_max = z
+            total = 0.0
+            for j in range(m):
+                total += np.exp((g[j] - C[i, j]) * inv_reg - z_max)
+            lse = z_max + np.log(total)
+            if it > 0:
+                err += abs(np.exp(f[i] * inv_reg + lse) - a[i])
+            f[i] = reg * (log_a[i] - lse)
+
+        if it > 0 and err < tol:
+            return f, g, True
+
+        # Row-major sweeps for the column logsumexp
+        col_max[:] = -np.inf
+        col_sum[:] = 0.0
+        for i in range(n):
+            for j in range(m):
+                z = (f[i] - C[i, j]) * inv_reg
+                if z > col_max[j]:
+                    col_max[j] = z
+        for i in range(n):
+            for j in range(m):
+                col_sum[j] += np.exp((f[i] - C[i, j]) * inv_reg - col_max[j])
+        for j in range(m):
+            g[j] = reg * (log_b[j] - (col_max[j] + np.log(col_sum[j])))
+
+    return f, g, False
+
+
+def batched_sinkhorn(
+    a: np.ndarray,
+    b: np.ndarray,
+    C_stack: np.ndarray,
+    reg: float,
+    n_iter: int = 200,
+    tol: float = 1e-9,
+) -> np.ndarray:
+    """
+    Sinkhorn-Knopp on a batch of cost matrices sharing marginals a, b.
+
+    All problems iterate together, so each step is one batched matmul over
+    the (B, N, M) kernel stack instead of B separate solves.
+
+    Args:
+        a: Source distribution (N,)
+        b: Target distribution (M,)
+        C_stack: Cost matrices (B, N, M)
+        reg: Entropic regularization
+        n_iter: Maximum Sinkhorn iterations
+        tol: Stop when every problem's column-marginal error is below this
+
+    Returns:
+        (B, N, M) transport plans
+    """
+    return batched_sinkhorn_kernel(a, b, np.exp(-C_stack / reg), n_iter, tol)
+
+
+def batched_sinkhorn_kernel(
+    a: np.ndarray,
+    b: np.ndarray,
+    K: np.ndarray,
+    n_iter: int = 200,
+    tol: float = 1e-9,
+    warmstart: tuple[np.ndarray, np.ndarray] | None = None,
+    log: bool = False,
+):
+    """
+    Sinkhorn-Knopp on a prebuilt (B, N, M) kernel stack K = exp(-C/reg).
+
+    For callers that can form the kernel more cheaply than exp(-C/reg)
+    from scratch, e.g. in the log domain from precomputed components.
+
+    Args:
+        a: Source distribution (N,)
+        b: Target distribution (M,)
+        K: Kernel stack (B, N, M)
+        n_iter: Maximum Sinkhorn iterations
+        tol: Stop when every problem's column-marginal error is below this
+        warmstart: Initial log scalings (log u (B, N), log v (B, M)), as in
+            POT; e.g. the final scalings of a solve on a nearby cost
+        log: Also return a dict with the final scalings u, v and n_iter
+
+    Returns:
+        (B, N, M) transport plans, plus the log dict when log=True
+    """
+    B, n, m = K.shape
+    if warmstart is None:
+        u = np.full((B, n), 1.0 / n)
+        v = np.full((B, m), 1.0 / m)
+    else:
+        u, v = np.exp(warmstart[0]), np.exp(warmstart[1])
+
+    it = -1  # n_iter=0 runs no iterations
+    for it in range(n_iter):
+        v = b / np.matmul(u[:, None, :], K)[:, 0, :]
+        u = a / np.matmul(K, v[:, :, None])[:, :, 0]
+
+        if it % 10 == 0:
+            col = v * np.matmul(u[:, None, :], K)[:, 0, :]
+            if np.max(np.abs(col - b)) < tol:
+                break
+
+    plans = u[:, :, None] * K * v[:, None, :]
+    if log:
+        return plans, {"u": u, "v": v, "n_iter": it + 1}
+    return plans
+
+
 def sinkhorn_unbalanced_solve(
     a: np.ndarray,
     b: np.ndarray,
@@ -60,12 +570,15 @@ def sinkhorn_unbalanced_solve(
     Returns:
         dict with keys: plan, cost, converged
     """
+    # Scaling-domain solver: exp(-C/reg) underflows in float32 at small
+    # reg, so it always runs in float64
+    a, b, C = (np.asarray(x, dtype=np.float64) for x in (a, b, C))
     T = ot.unbalanced.sinkhorn_unbalanced(
         a, b, C, reg=reg, reg_m=reg_m, numItermax=max_iter
     )
     cost = float(np.sum(T * C))
     return {
-        "plan": T.tolist(),
+        "plan": T,
         "cost": cost,
         "converged": True,
     }
@@ -93,13 +606,16 @@ def partial_sinkhorn_solve(
     Returns:
         dict with keys: plan, cost, mass_transported
     """
+    # Scaling-domain solver: exp(-C/reg) underflows in float32 at small
+    # reg, so it always runs in float64
+    a, b, C = (np.asarray(x, dtype=np.float64) for x in (a, b, C))
     T = ot.partial.entropic_partial_wasserstein(
         a, b, C, reg=reg, m=mass, numItermax=max_iter
     )
     cost = float(np.sum(T * C))
     transported = float(np.sum(T))
     return {
-        "plan": T.tolist(),
+        "plan": T,
         "cost": cost,
         "mass_transported": transported,
     }
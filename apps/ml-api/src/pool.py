@@ -0,0 +1,155 @@
+"""
+Process pool for CPU-bound solver calls.
+
+Route handlers are async, but Sinkhorn/POT calls block for the whole
+solve; run in the event loop they serialize concurrent requests. They are
+offloaded to a process pool sized to the available cores instead. Each
+worker pins its BLAS/OpenMP pools to one thread, so N workers on N cores
+do not oversubscribe (N workers × N BLAS threads).
+
+Large read-only arrays can be handed to workers through shared memory
+(see shared_array) rather than pickled on every call.
+
+If a worker dies (OOM kill, crash in a C extension) the executor is
+broken for good; run_in_pool then replaces it and retries the call once.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+_BLAS_THREAD_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Picklable handle to an ndarray held in a shared memory block."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def _worker_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def _init_worker() -> None:
+    """Limit BLAS/OpenMP to one thread in each worker process."""
+    for var in _BLAS_THREAD_VARS:
+        os.environ[var] = "1"
+    # Workers share any GPU; JAX would otherwise preallocate most of its
+    # memory in each of them
+    os.environ.setdefault("XLA_PYTHON_CLIENT_PREALLOCATE", "false")
+    # numpy may already be loaded (it is imported by this module), so also
+    # cap the live thread pools
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=1)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared worker pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        # spawn, not fork: forking a process with a running event loop and
+        # BLAS threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool (on application shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) in the worker pool without blocking the loop.
+
+    SharedArray arguments are attached as ndarrays in the worker. If the
+    pool is broken (a worker died), it is replaced and the call retried
+    once on the new pool.
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(_call, fn, args, kwargs)
+    pool = get_pool()
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return await loop.run_in_executor(get_pool(), call)
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next get_pool() starts a fresh one."""
+    global _pool
+    # Concurrent calls on the same broken pool all land here; only the
+    # first may reset, or it would shut down its replacement
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def shared_array(arr: np.ndarray):
+    """
+    Copy arr into a shared memory block for the duration of the context.
+
+    Yields:
+        SharedArray handle to pass to run_in_pool
+    """
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    try:
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        yield SharedArray(shm.name, arr.shape, arr.dtype.str)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _call(fn, args: tuple, kwargs: dict):
+    """Worker-side trampoline: attach shared arrays, then call fn."""
+    blocks = []
+
+    def attach(value):
+        if not isinstance(value, SharedArray):
+            return value
+        shm = SharedMemory(name=value.name)
+        blocks.append(shm)
+        return np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)
+
+    try:
+        args = tuple(attach(v) for v in args)
+        kwargs = {k: attach(v) for k, v in kwargs.items()}
+        return fn(*args, **kwargs)
+    finally:
+        # Views into the blocks must be gone before they can be closed
+        del args, kwargs
+        for shm in blocks:
+            shm.close()
@@ -3,38 +3,62 @@ FastAPI routes for OT-based venue-event matching.
 
 Endpoints:
   POST /match        — Solve OT matching problem
+  POST /match/lazy   — Streamed OT between feature sets (dual potentials only)
   POST /barycenter   — Compute ideal venue profile
   POST /learn-weights — Learn cost weights from history
   POST /fgw          — Fused Gromov-Wasserstein matching
+  GET  /health       — Liveness and GPU availability
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
+import msgspec
 import numpy as np
+import orjson
 
 from ..ot.solver import (
     sinkhorn_solve,
+    sinkhorn_lazy_solve,
     sinkhorn_unbalanced_solve,
     partial_sinkhorn_solve,
 )
 from ..ot.barycenter import compute_barycenter, score_against_barycenter
 from ..ot.inverse_ot import learn_cost_weights
-from ..ot.fgw import fused_gromov_wasserstein, build_structural_cost
+from ..ot.fgw import fused_gromov_wasserstein, build_structural_cost, gpu_available
+from ..pool import run_in_pool, shared_array, shutdown_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_pool()
 
-app = FastAPI(title="OmniTwin ML API", version="0.1.0")
+
+# Solver calls run in a process pool (see src/pool.py) so concurrent
+# requests are not serialized on the event loop
+app = FastAPI(title="OmniTwin ML API", version="0.1.0", lifespan=lifespan)
 
 
 # ─── Request/Response Models ───────────────────────────────────────────────
 
+# /match and /fgw carry N×M matrices; their requests are msgspec Structs
+# decoded from the raw body, so element validation runs in C rather than
+# as one Pydantic validator call per cell.
+
 
-class MatchRequest(BaseModel):
+class MatchRequest(msgspec.Struct):
     a: list[float]
     b: list[float]
     cost_matrix: list[list[float]]
     reg: float = 0.01
-    method: str = "balanced"  # "balanced" | "unbalanced" | "partial"
+    method: str = "balanced"  # "balanced" | "acc_sinkhorn" | "unbalanced" | "partial"
     reg_m: float = 0.1       # for unbalanced
     mass: float = 0.7        # for partial
+    precision: Literal["f32", "f64"] = "f64"  # balanced/acc_sinkhorn only
 
 
 class MatchResponse(BaseModel):
@@ -43,11 +67,29 @@ class MatchResponse(BaseModel):
     converged: bool
 
 
+class LazyMatchRequest(BaseModel):
+    X_s: list[list[float]]
+    X_t: list[list[float]]
+    a: list[float] | None = None  # uniform if omitted
+    b: list[float] | None = None  # uniform if omitted
+    metric: str = "sqeuclidean"
+    reg: float = 0.01
+    precision: Literal["f32", "f64"] = "f64"
+
+
+class LazyMatchResponse(BaseModel):
+    f: list[float]
+    g: list[float]
+    cost: float
+    converged: bool
+
+
 class BarycenterRequest(BaseModel):
     distributions: list[list[float]]
     cost_matrix: list[list[float]]
     weights: list[float] | None = None
     reg: float = 0.01
+    solver: str = "pot"      # "pot" | "ott" | "rbm"
 
 
 class BarycenterResponse(BaseModel):
@@ -82,13 +124,16 @@ class LearnWeightsResponse(BaseModel):
     converged: bool
 
 
-class FGWRequest(BaseModel):
+class FGWRequest(msgspec.Struct):
     C1: list[list[float]]
     C2: list[list[float]]
     M: list[list[float]]
     p: list[float]
     q: list[float]
     alpha: float = 0.5
+    solver: str = "auto"     # "auto" | "pot" | "ott"
+    reg: float = 0.01        # for ott
+    precision: Literal["f32", "f64"] = "f64"
 
 
 class FGWResponse(BaseModel):
@@ -98,47 +143,144 @@ class FGWResponse(BaseModel):
     gw_cost: float
 
 
+class HealthResponse(BaseModel):
+    status: str
+    gpu: bool  # large FGW requests run on the GPU with solver="auto"
+
+
+# ─── Serialization ─────────────────────────────────────────────────────────
+
+
+# Request precision flag -> working dtype. float64 is the default; "f32"
+# is an opt-in that halves memory traffic (at ~1e-6 accuracy) for solvers
+# that stay stable in it. Unbalanced, partial, barycenter and score form
+# exp(-C/reg) without a log-domain fallback, so they are always float64.
+_DTYPES = {"f32": np.float32, "f64": np.float64}
+
+# /match methods backed by scaling-domain solvers, which ignore "f32"
+_SCALING_DOMAIN_METHODS = ("unbalanced", "partial")
+
+
+def _as_array(values, precision: str = "f64") -> np.ndarray:
+    """Parse a JSON list (or nested list) into a float ndarray in one pass."""
+    return np.asarray(values, dtype=_DTYPES[precision])
+
+
+def _decode(body: bytes, struct: type):
+    """Decode and validate a JSON body into a msgspec Struct (422 on failure)."""
+    try:
+        return msgspec.json.decode(body, type=struct)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _openapi_body(struct: type) -> dict:
+    """OpenAPI requestBody for an endpoint that decodes a msgspec Struct."""
+    _, components = msgspec.json.schema_components([struct])
+    schema = components[struct.__name__]
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+def _json_response(payload: dict) -> Response:
+    """
+    Encode a payload with orjson, serializing ndarrays natively.
+
+    Avoids the per-cell Python float boxing of ndarray.tolist() followed by
+    response-model validation, which dominates for large transport plans.
+    """
+    return Response(
+        content=orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        media_type="application/json",
+    )
+
+
 # ─── Endpoints ─────────────────────────────────────────────────────────────
 
 
-@app.post("/match", response_model=MatchResponse)
-async def match(req: MatchRequest):
+@app.post(
+    "/match",
+    response_model=None,
+    responses={200: {"model": MatchResponse}},
+    openapi_extra=_openapi_body(MatchRequest),
+)
+async def match(request: Request):
     """Solve OT matching problem."""
+    req = _decode(await request.body(), MatchRequest)
     try:
-        a = np.array(req.a)
-        b = np.array(req.b)
-        C = np.array(req.cost_matrix)
+        precision = "f64" if req.method in _SCALING_DOMAIN_METHODS else req.precision
+        a = _as_array(req.a, precision)
+        b = _as_array(req.b, precision)
+        C = _as_array(req.cost_matrix, precision)
 
         if req.method == "unbalanced":
-            result = sinkhorn_unbalanced_solve(a, b, C, reg=req.reg, reg_m=req.reg_m)
+            result = await run_in_pool(
+                sinkhorn_unbalanced_solve, a, b, C, reg=req.reg, reg_m=req.reg_m
+            )
         elif req.method == "partial":
-            result = partial_sinkhorn_solve(a, b, C, mass=req.mass, reg=req.reg)
+            result = await run_in_pool(
+                partial_sinkhorn_solve, a, b, C, mass=req.mass, reg=req.reg
+            )
+        elif req.method == "acc_sinkhorn":
+            result = await run_in_pool(
+                sinkhorn_solve, a, b, C, reg=req.reg, method="acc_sinkhorn"
+            )
         else:
-            result = sinkhorn_solve(a, b, C, reg=req.reg)
+            result = await run_in_pool(sinkhorn_solve, a, b, C, reg=req.reg)
 
-        return MatchResponse(
-            plan=result["plan"],
-            cost=result["cost"],
-            converged=result.get("converged", True),
+        return _json_response({
+            "plan": result["plan"],
+            "cost": result["cost"],
+            "converged": result.get("converged", True),
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post(
+    "/match/lazy",
+    response_model=None,
+    responses={200: {"model": LazyMatchResponse}},
+)
+async def match_lazy(req: LazyMatchRequest):
+    """Solve OT between feature sets without materializing the cost matrix."""
+    try:
+        X_s = _as_array(req.X_s, req.precision)
+        X_t = _as_array(req.X_t, req.precision)
+        n, m = X_s.shape[0], X_t.shape[0]
+        a = _as_array(req.a if req.a else np.ones(n) / n, req.precision)
+        b = _as_array(req.b if req.b else np.ones(m) / m, req.precision)
+
+        result = await run_in_pool(
+            sinkhorn_lazy_solve, a, b, X_s, X_t, metric=req.metric, reg=req.reg
         )
+
+        return _json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/barycenter", response_model=BarycenterResponse)
+@app.post(
+    "/barycenter",
+    response_model=None,
+    responses={200: {"model": BarycenterResponse}},
+)
 async def barycenter(req: BarycenterRequest):
     """Compute Wasserstein barycenter."""
     try:
-        dists = [np.array(d) for d in req.distributions]
-        C = np.array(req.cost_matrix)
-        weights = np.array(req.weights) if req.weights else None
-
-        result = compute_barycenter(dists, C, weights=weights, reg=req.reg)
+        dists = list(_as_array(req.distributions))
+        C = _as_array(req.cost_matrix)
+        weights = _as_array(req.weights) if req.weights else None
 
-        return BarycenterResponse(
-            barycenter=result["barycenter"],
-            support_size=result["support_size"],
+        result = await run_in_pool(
+            compute_barycenter, dists, C, weights=weights, reg=req.reg, solver=req.solver
         )
+
+        return _json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -147,11 +289,13 @@ async def barycenter(req: BarycenterRequest):
 async def score(req: ScoreRequest):
     """Score a candidate against the ideal barycenter."""
     try:
-        bary = np.array(req.barycenter)
-        candidate = np.array(req.candidate)
-        C = np.array(req.cost_matrix)
+        bary = _as_array(req.barycenter)
+        candidate = _as_array(req.candidate)
+        C = _as_array(req.cost_matrix)
 
-        divergence = score_against_barycenter(bary, candidate, C, reg=req.reg)
+        divergence = await run_in_pool(
+            score_against_barycenter, bary, candidate, C, reg=req.reg
+        )
 
         return ScoreResponse(divergence=divergence)
     except Exception as e:
@@ -162,35 +306,57 @@ async def score(req: ScoreRequest):
 async def learn_weights_endpoint(req: LearnWeightsRequest):
     """Learn optimal cost weights from observed matchings."""
     try:
-        cost_components = [np.array(c) for c in req.cost_components]
-        initial = np.array(req.initial_weights) if req.initial_weights else None
-
-        result = learn_cost_weights(
-            matchings=req.matchings,
-            cost_components=cost_components,
-            n_events=req.n_events,
-            n_venues=req.n_venues,
-            reg=req.reg,
-            initial_weights=initial,
-        )
+        cost_components = _as_array(req.cost_components)
+        initial = _as_array(req.initial_weights) if req.initial_weights else None
+
+        # The (K, N, M) components go through shared memory, not the pickle pipe
+        with shared_array(cost_components) as components_ref:
+            result = await run_in_pool(
+                learn_cost_weights,
+                matchings=req.matchings,
+                cost_components=components_ref,
+                n_events=req.n_events,
+                n_venues=req.n_venues,
+                reg=req.reg,
+                initial_weights=initial,
+            )
 
         return LearnWeightsResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/fgw", response_model=FGWResponse)
-async def fgw(req: FGWRequest):
+@app.post(
+    "/fgw",
+    response_model=None,
+    responses={200: {"model": FGWResponse}},
+    openapi_extra=_openapi_body(FGWRequest),
+)
+async def fgw(request: Request):
     """Fused Gromov-Wasserstein matching."""
+    req = _decode(await request.body(), FGWRequest)
     try:
-        C1 = np.array(req.C1)
-        C2 = np.array(req.C2)
-        M = np.array(req.M)
-        p = np.array(req.p)
-        q = np.array(req.q)
-
-        result = fused_gromov_wasserstein(C1, C2, M, p, q, alpha=req.alpha)
+        C1 = _as_array(req.C1, req.precision)
+        C2 = _as_array(req.C2, req.precision)
+        M = _as_array(req.M, req.precision)
+        p = _as_array(req.p, req.precision)
+        q = _as_array(req.q, req.precision)
+
+        result = await run_in_pool(
+            fused_gromov_wasserstein,
+            C1, C2, M, p, q, alpha=req.alpha, solver=req.solver, reg=req.reg,
+        )
 
-        return FGWResponse(**result)
+        return _json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health():
+    """Liveness check; reports whether a GPU is available to the solvers."""
+    # The GPU probe runs in a pool worker (cached there), never in this
+    # process: initializing JAX's CUDA backend here would preallocate device
+    # memory the workers need. Without JAX installed there is nothing to probe
+    gpu = find_spec("jax") is not None and await run_in_pool(gpu_available)
+    return HealthResponse(status="ok", gpu=gpu)
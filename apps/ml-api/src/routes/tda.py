@@ -33,6 +33,7 @@ class MapperRequest(BaseModel):
     compatibility_scores: list[list[float]]
     n_cubes: int = 12
     overlap: float = 0.4
+    clusterer: str = "dbscan"  # "dbscan" | "hdbscan"
 
 
 class FurnitureItem(BaseModel):
@@ -145,6 +146,7 @@ async def build_mapper_graph(request: MapperRequest):
     result = build_compatibility_mapper(
         venue_features, event_features, compat,
         n_cubes=request.n_cubes, overlap=request.overlap,
+        clusterer=request.clusterer,
     )
 
     return result
@@ -190,13 +192,17 @@ async def detect_periodicity(request: TimeSeriesRequest):
     SW1PerS periodicity detection on booking time series.
     """
     import numpy as np
+    from ..pool import run_in_pool
     from ..tda.timeseries import detect_periodicity_sw1pers
 
     ts = np.array(request.values)
     if len(ts) < 30:
         raise HTTPException(400, "Need at least 30 data points")
 
-    result = detect_periodicity_sw1pers(ts, window_sizes=request.window_sizes)
+    # Ripser calls block; run the scan in the process pool, off the loop
+    result = await run_in_pool(
+        detect_periodicity_sw1pers, ts, window_sizes=request.window_sizes
+    )
     return {"periodicities": result}
 
 
@@ -206,13 +212,17 @@ async def detect_regime_changes_endpoint(request: RegimeChangeRequest):
     Persistence landscape regime change detection.
     """
     import numpy as np
+    from ..pool import run_in_pool
     from ..tda.timeseries import detect_regime_changes
 
     ts = np.array(request.values)
     if len(ts) < request.window_size * 2:
         raise HTTPException(400, "Time series too short for window size")
 
-    result = detect_regime_changes(ts, request.window_size, request.step)
+    # One Ripser call per window; run in the process pool, off the loop
+    result = await run_in_pool(
+        detect_regime_changes, ts, request.window_size, request.step
+    )
     return {"change_points": result}
 
 
@@ -5,9 +5,9 @@ Handles continuous, categorical, binary, and geographic feature types.
 Satisfies triangle inequality. Directly feedable to Ripser as a distance matrix.
 """
 
+from functools import lru_cache
+
 import numpy as np
-import pandas as pd
-from gower import gower_matrix
 
 # Standard amenity names for binary feature expansion
 AMENITY_NAMES = [
@@ -15,6 +15,19 @@ AMENITY_NAMES = [
     "outdoor", "parking", "catering", "bar", "dancefloor",
 ]
 
+# Continuous features, in column order of the encoded feature matrix
+CONTINUOUS_FEATURES = ["capacity", "price_per_event", "sq_footage", "lat", "lng"]
+
+# Venue counts up to which whole distance matrices are memoized (a 2000²
+# float32 matrix is 16 MB); larger matrices, up to GBs for the 10K-50K
+# persistence paths, are built per call and freed with the request
+MATRIX_CACHE_MAX_VENUES = 2000
+
+# Popcount lookup for amenity bitmasks (10 flags fit in 1024 entries)
+_POPCOUNT = np.array(
+    [bin(i).count("1") for i in range(1 << len(AMENITY_NAMES))], dtype=np.float64
+)
+
 
 def build_venue_distance_matrix(
     venues: list[dict],
@@ -27,11 +40,19 @@ def build_venue_distance_matrix(
     Gower distance:
     - Continuous features (capacity, price, sqft): range-normalized Manhattan
     - Categorical features (venue_type): simple match/mismatch (0 or 1)
-    - Binary features (amenities): Dice coefficient
+    - Binary features (amenities): Jaccard dissimilarity of the amenity sets,
+      popcount(a XOR b) / popcount(a OR b) on packed bitmasks, weighted as
+      a single feature in the average
     - Geographic (lat/lng): continuous, range-normalized
 
     All normalized to [0,1], averaged. Satisfies triangle inequality.
 
+    Features are encoded column-wise (one array per feature type) and each
+    sub-distance is computed with NumPy broadcasting, so no Python code
+    runs per venue pair. Encodings are LRU-cached on the venue feature
+    values, so overlapping requests reuse them; so are whole matrices of up
+    to MATRIX_CACHE_MAX_VENUES venues.
+
     Args:
         venues: List of venue dicts with keys: capacity, price_per_event,
                 sq_footage, venue_type, lat, lng, amenities (bool list)
@@ -41,37 +62,94 @@ def build_venue_distance_matrix(
     Returns:
         N×N symmetric distance matrix with values in [0, 1]
     """
-    df = pd.DataFrame(venues)
-
-    # Expand amenities list into binary columns
-    for i, name in enumerate(AMENITY_NAMES):
-        df[f"amenity_{name}"] = df["amenities"].apply(
-            lambda a, idx=i: bool(a[idx]) if idx < len(a) else False
+    key = _venue_key(venues)
+    if len(key) <= MATRIX_CACHE_MAX_VENUES:
+        return _venue_distance_cached(key, capacity_weight, price_weight).copy()
+    return _venue_distance(key, capacity_weight, price_weight)
+
+
+def _venue_key(venues: list[dict]) -> tuple:
+    """Hashable cache key for a venue list: its feature values, in order."""
+    n_amenities = len(AMENITY_NAMES)
+    return tuple(
+        (
+            *(v[k] for k in CONTINUOUS_FEATURES),
+            v["venue_type"],
+            tuple(bool(flag) for flag in v["amenities"][:n_amenities]),
         )
+        for v in venues
+    )
+
 
-    # Select feature columns with proper dtypes
-    feature_cols = [
-        "capacity", "price_per_event", "sq_footage",  # continuous
-        "venue_type",                                   # categorical
-        "lat", "lng",                                   # continuous (geographic)
-    ]
-    feature_cols += [f"amenity_{n}" for n in AMENITY_NAMES]  # binary
+@lru_cache(maxsize=128)
+def _encode_features(key: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Structure-of-arrays encoding of a venue key.
 
-    feature_df = df[feature_cols].copy()
+    Returns:
+        (continuous (N, 5) float64, venue_type codes (N,), amenity bitmasks (N,) uint16)
+    """
+    n_cont = len(CONTINUOUS_FEATURES)
+    cont = np.array([row[:n_cont] for row in key], dtype=np.float64).reshape(-1, n_cont)
+    _, cat = np.unique([row[n_cont] for row in key], return_inverse=True)
+    amen = np.array(
+        [sum(1 << i for i, flag in enumerate(row[n_cont + 1]) if flag) for row in key],
+        dtype=np.uint16,
+    )
+    for arr in (cont, cat, amen):
+        arr.flags.writeable = False
+    return cont, cat, amen
+
+
+@lru_cache(maxsize=16)
+def _venue_distance_cached(
+    key: tuple,
+    capacity_weight: float,
+    price_weight: float,
+) -> np.ndarray:
+    """Read-only _venue_distance, cached for small keys; callers must copy."""
+    dist = _venue_distance(key, capacity_weight, price_weight)
+    dist.flags.writeable = False
+    return dist
 
-    # Gower handles dtype detection automatically:
-    #   float/int -> continuous, object/category -> categorical, bool -> binary
-    feature_df["venue_type"] = feature_df["venue_type"].astype("category")
-    for col in feature_df.columns:
-        if col.startswith("amenity_"):
-            feature_df[col] = feature_df[col].astype(bool)
 
-    # Per-feature weights
-    weights = np.ones(len(feature_df.columns))
-    weights[0] = capacity_weight   # capacity
-    weights[1] = price_weight      # price
+def _venue_distance(
+    key: tuple,
+    capacity_weight: float,
+    price_weight: float,
+) -> np.ndarray:
+    """Gower distance matrix for a venue key."""
+    cont, cat, amen = _encode_features(key)
+    n = len(key)
 
-    return gower_matrix(feature_df, weight=weights)
+    # Per-feature weights
+    cont_weights = np.ones(len(CONTINUOUS_FEATURES))
+    cont_weights[0] = capacity_weight   # capacity
+    cont_weights[1] = price_weight      # price
+    weight_sum = cont_weights.sum() + 1.0 + 1.0  # + venue_type + amenities
+
+    # Continuous: range-normalized Manhattan, one feature at a time to keep
+    # the working set at N×N
+    dist = np.zeros((n, n))
+    ranges = np.ptp(cont, axis=0) if n > 0 else np.zeros(len(CONTINUOUS_FEATURES))
+    for k in range(cont.shape[1]):
+        if ranges[k] > 0:
+            col = cont[:, k]
+            dist += (cont_weights[k] / ranges[k]) * np.abs(col[:, None] - col[None, :])
+
+    # Categorical: mismatch
+    dist += cat[:, None] != cat[None, :]
+
+    # Binary: Jaccard on bitmasks. It is already a [0, 1] dissimilarity
+    # over the whole amenity set, so it carries one feature's weight; one
+    # unit per flag would let a single differing amenity dominate sparse sets
+    differ = _POPCOUNT[amen[:, None] ^ amen[None, :]]
+    union = _POPCOUNT[amen[:, None] | amen[None, :]]
+    np.divide(differ, union, out=differ, where=union > 0)
+    dist += differ
+
+    dist /= weight_sum
+    return dist.astype(np.float32)
 
 
 def build_distance_from_points(points: np.ndarray) -> np.ndarray:
@@ -16,8 +16,10 @@ Interpretation:
 
 import numpy as np
 import kmapper as km
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
 from sklearn.decomposition import PCA
-from sklearn.cluster import DBSCAN
+from sklearn.cluster import DBSCAN, HDBSCAN
 
 
 def build_compatibility_mapper(
@@ -28,6 +30,9 @@ def build_compatibility_mapper(
     overlap: float = 0.4,
     eps: float = 0.3,
     min_samples: int = 5,
+    clusterer: str = "dbscan",
+    graph: dict | None = None,
+    X: np.ndarray | None = None,
 ) -> dict:
     """
     Build a Mapper graph of the venue-event compatibility space.
@@ -39,7 +44,12 @@ def build_compatibility_mapper(
         n_cubes: Number of intervals for the Mapper cover
         overlap: Fractional overlap between intervals
         eps: DBSCAN epsilon parameter
-        min_samples: DBSCAN minimum cluster size
+        min_samples: DBSCAN minimum cluster size (HDBSCAN min_cluster_size,
+                     clamped to at least 2 as HDBSCAN requires)
+        clusterer: "dbscan" or "hdbscan" (density-adaptive, ignores eps)
+        graph: Precomputed KeplerMapper graph for these inputs (skips the
+               lens and clustering; the cover/DBSCAN parameters are unused)
+        X: Precomputed joint feature matrix for these inputs
 
     Returns:
         Dict with nodes, edges, stats, and optional HTML visualization
@@ -47,51 +57,50 @@ def build_compatibility_mapper(
     n_venues, n_events = compatibility_scores.shape
 
     # Build joint feature space: each row = one venue-event pair
-    joint_features = []
-    for i in range(n_venues):
-        for j in range(n_events):
-            row = np.concatenate([
-                venue_features[i],
-                event_features[j],
-                [compatibility_scores[i, j]],
-            ])
-            joint_features.append(row)
-    X = np.array(joint_features)
+    if X is None:
+        X = _build_joint_feature_matrix(
+            venue_features, event_features, compatibility_scores
+        )
 
-    mapper = km.KeplerMapper(verbose=0)
+    if graph is None:
+        mapper = km.KeplerMapper(verbose=0)
 
-    # Filter: PCA projection to 2D (captures max variance)
-    lens = mapper.fit_transform(X, projection=PCA(n_components=2))
+        # Filter: PCA projection to 2D (captures max variance)
+        lens = mapper.fit_transform(X, projection=PCA(n_components=2))
 
-    # Build graph: DBSCAN clustering within overlapping intervals
-    graph = mapper.map(
-        lens,
-        X,
-        clusterer=DBSCAN(eps=eps, min_samples=min_samples),
-        cover=km.Cover(n_cubes=n_cubes, perc_overlap=overlap),
-    )
+        # Build graph: DBSCAN clustering within overlapping intervals
+        graph = mapper.map(
+            lens,
+            X,
+            clusterer=_make_clusterer(clusterer, eps, min_samples),
+            cover=km.Cover(n_cubes=n_cubes, perc_overlap=overlap),
+        )
 
     # Extract graph structure for frontend rendering
+    compatibility = np.ascontiguousarray(X[:, -1])
     nodes = []
     for node_id, members in graph["nodes"].items():
+        member_arr = np.asarray(members, dtype=np.int64)
+        # Decode member indices back to (venue_idx, event_idx) pairs
+        venue_idx, event_idx = np.divmod(member_arr, n_events)
         nodes.append({
             "id": node_id,
             "size": len(members),
-            "mean_compatibility": float(np.mean(X[members, -1])),
+            "mean_compatibility": float(compatibility[member_arr].mean()),
             "member_indices": members,
-            # Decode member indices back to (venue_idx, event_idx) pairs
             "pairs": [
-                {"venue_idx": int(m // n_events), "event_idx": int(m % n_events)}
-                for m in members
+                {"venue_idx": v, "event_idx": e}
+                for v, e in zip(venue_idx.tolist(), event_idx.tolist())
             ],
         })
 
-    edges = []
-    for source_id, targets in graph["links"].items():
-        for target_id in targets:
-            edges.append({"source": source_id, "target": target_id})
+    edges = [
+        {"source": source_id, "target": target_id}
+        for source_id, targets in graph["links"].items()
+        for target_id in targets
+    ]
 
-    # Count connected components via BFS
+    # Count connected components
     num_components = _count_components(graph)
 
     return {
@@ -116,21 +125,11 @@ def build_mapper_with_html(
     Build Mapper graph with self-contained HTML visualization.
 
     Returns the same dict as build_compatibility_mapper plus an 'html' key
-    containing a full HTML page for embedding in an iframe.
+    containing a full HTML page for embedding in an iframe. The lens and
+    clustering run once and are shared by the HTML and the graph dict.
     """
-    n_venues, n_events = compatibility_scores.shape
-
     # Build joint space
-    joint_features = []
-    for i in range(n_venues):
-        for j in range(n_events):
-            row = np.concatenate([
-                venue_features[i],
-                event_features[j],
-                [compatibility_scores[i, j]],
-            ])
-            joint_features.append(row)
-    X = np.array(joint_features)
+    X = _build_joint_feature_matrix(venue_features, event_features, compatibility_scores)
 
     mapper = km.KeplerMapper(verbose=0)
     lens = mapper.fit_transform(X, projection=PCA(n_components=2))
@@ -139,56 +138,87 @@ def build_mapper_with_html(
     overlap = kwargs.get("overlap", 0.4)
     eps = kwargs.get("eps", 0.3)
     min_samples = kwargs.get("min_samples", 5)
+    clusterer = kwargs.get("clusterer", "dbscan")
 
     graph = mapper.map(
         lens,
         X,
-        clusterer=DBSCAN(eps=eps, min_samples=min_samples),
+        clusterer=_make_clusterer(clusterer, eps, min_samples),
         cover=km.Cover(n_cubes=n_cubes, perc_overlap=overlap),
     )
 
+    # The page is returned inline, so skip writing it to disk
     html = mapper.visualize(
         graph,
-        path_html="mapper_graph.html",
         title="Venue-Event Compatibility Space",
         color_values=X[:, -1],
         color_function_name="Compatibility Score",
+        save_file=False,
     )
 
     result = build_compatibility_mapper(
-        venue_features, event_features, compatibility_scores, **kwargs
+        venue_features, event_features, compatibility_scores,
+        graph=graph, X=X, **kwargs,
     )
     result["html"] = html
     return result
 
 
+def _make_clusterer(clusterer: str, eps: float, min_samples: int):
+    """
+    Per-interval clusterer for the Mapper graph.
+
+    DBSCAN parallelizes its neighborhood queries across cores. HDBSCAN
+    needs no eps and handles clusters of varying density.
+    """
+    if clusterer == "hdbscan":
+        # HDBSCAN rejects min_cluster_size < 2; DBSCAN accepts min_samples=1
+        return HDBSCAN(min_cluster_size=max(min_samples, 2), n_jobs=-1)
+    if clusterer == "dbscan":
+        return DBSCAN(eps=eps, min_samples=min_samples, n_jobs=-1)
+    raise ValueError(f"Unknown clusterer: {clusterer}")
+
+
+def _build_joint_feature_matrix(
+    venue_features: np.ndarray,
+    event_features: np.ndarray,
+    compatibility_scores: np.ndarray,
+) -> np.ndarray:
+    """
+    Joint venue-event feature matrix, one row per (venue, event) pair.
+
+    Row i * N_events + j is [venue_features[i], event_features[j],
+    compatibility_scores[i, j]], assembled by broadcasting in one pass.
+
+    Returns:
+        (N_venues * N_events, d_v + d_e + 1) float64 array
+    """
+    venue_features = np.asarray(venue_features, dtype=np.float64)
+    event_features = np.asarray(event_features, dtype=np.float64)
+    n_venues, n_events = compatibility_scores.shape
+
+    V = np.broadcast_to(
+        venue_features[:, None, :], (n_venues, n_events, venue_features.shape[1])
+    )
+    E = np.broadcast_to(
+        event_features[None, :, :], (n_venues, n_events, event_features.shape[1])
+    )
+    C = np.asarray(compatibility_scores, dtype=np.float64)[:, :, None]
+    return np.concatenate([V, E, C], axis=2).reshape(n_venues * n_events, -1)
+
+
 def _count_components(graph: dict) -> int:
-    """Count connected components in a Mapper graph via BFS."""
+    """Count connected components in a Mapper graph (SciPy csgraph)."""
     if not graph["nodes"]:
         return 0
 
-    node_ids = set(graph["nodes"].keys())
-    adj: dict[str, set] = {nid: set() for nid in node_ids}
-    for source, targets in graph["links"].items():
-        for target in targets:
-            adj[source].add(target)
-            adj[target].add(source)
-
-    visited: set[str] = set()
-    components = 0
-
-    for node in node_ids:
-        if node in visited:
-            continue
-        components += 1
-        queue = [node]
-        while queue:
-            current = queue.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            for neighbor in adj.get(current, set()):
-                if neighbor not in visited:
-                    queue.append(neighbor)
-
-    return components
+    index = {nid: i for i, nid in enumerate(graph["nodes"])}
+    sources = [index[s] for s, targets in graph["links"].items() for _ in targets]
+    targets = [index[t] for ts in graph["links"].values() for t in ts]
+
+    n = len(index)
+    adjacency = sp.coo_matrix(
+        (np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n)
+    )
+    num_components, _ = connected_components(adjacency, directed=False)
+    return int(num_components)
@@ -15,7 +15,10 @@ Interpretation for venue data:
 """
 
 import numpy as np
+import scipy.sparse as sp
 from ripser import ripser
+from scipy.spatial.distance import squareform
+from scipy.special import entr
 
 
 def compute_persistence(
@@ -23,6 +26,7 @@ def compute_persistence(
     max_dim: int = 2,
     threshold: float | None = None,
     n_perm: int | None = None,
+    edge_collapse: bool = False,
 ) -> dict:
     """
     Compute persistent homology via Vietoris-Rips filtration.
@@ -33,27 +37,36 @@ def compute_persistence(
         threshold: Max filtration value. Set to 0.8 for Gower distances
                    to prevent exponential complex growth.
         n_perm: Greedy permutation subsampling size (for large datasets)
+        edge_collapse: Collapse the threshold graph before Ripser (requires
+                       threshold); same diagrams, much cheaper H₂
 
     Returns:
         Dictionary with persistence diagrams per dimension and statistics.
     """
-    kwargs: dict = {
-        "maxdim": max_dim,
-        "distance_matrix": True,
-    }
-    if threshold is not None:
-        kwargs["thresh"] = threshold
-    if n_perm is not None:
-        kwargs["n_perm"] = n_perm
-
-    result = ripser(distance_matrix, **kwargs)
+    # Ripser works in float32 anyway; Gower distances lie in [0, 1], so
+    # this loses nothing and halves the memory streamed by the copies below
+    distance_matrix = np.asarray(distance_matrix, dtype=np.float32)
+
+    if edge_collapse:
+        dgms = _ripser_collapsed(distance_matrix, max_dim, threshold, n_perm)
+    elif n_perm is None:
+        dgms = _ripser_condensed(distance_matrix, max_dim, threshold)
+    else:
+        kwargs: dict = {
+            "maxdim": max_dim,
+            "distance_matrix": True,
+            "n_perm": n_perm,
+        }
+        if threshold is not None:
+            kwargs["thresh"] = threshold
+        dgms = ripser(distance_matrix, **kwargs)["dgms"]
 
     diagrams: dict = {}
     stats: dict = {}
 
     for dim in range(max_dim + 1):
         key = f"H{dim}"
-        dgm = result["dgms"][dim]
+        dgm = dgms[dim]
 
         # Filter out infinite features for finite analysis
         finite = dgm[dgm[:, 1] != np.inf] if len(dgm) > 0 else np.empty((0, 2))
@@ -63,22 +76,7 @@ def compute_persistence(
 
         # Persistence statistics (Ali et al. 2023 — these simple stats
         # outperform complex vectorizations on standard benchmarks)
-        if len(lifespans) > 0:
-            normed = lifespans / (lifespans.sum() + 1e-10)
-            entropy = float(-np.sum(normed * np.log(normed + 1e-10)))
-            stats[key] = {
-                "count": int(len(lifespans)),
-                "mean_lifespan": float(np.mean(lifespans)),
-                "std_lifespan": float(np.std(lifespans)),
-                "median_lifespan": float(np.median(lifespans)),
-                "max_lifespan": float(np.max(lifespans)),
-                "iqr_lifespan": float(
-                    np.percentile(lifespans, 75) - np.percentile(lifespans, 25)
-                ),
-                "entropy": entropy,
-            }
-        else:
-            stats[key] = {"count": 0}
+        stats[key] = _persistence_stats(lifespans)
 
     return {
         "diagrams": diagrams,
@@ -87,6 +85,105 @@ def compute_persistence(
     }
 
 
+def _ripser_condensed(
+    distance_matrix: np.ndarray,
+    max_dim: int,
+    threshold: float | None,
+) -> list[np.ndarray]:
+    """
+    Ripser diagrams for a dense distance matrix, fed in condensed form.
+
+    ripser() flattens the strict upper triangle through two N×N index grids
+    and a boolean mask (tens of bytes of temporaries per cell) before
+    handing a float32 condensed vector to its C++ core. squareform produces
+    the same vector directly, so we call the core with it. Nonzero
+    diagonals (vertex births) still go through ripser()'s sparse path.
+
+    The core (pyRipser) is private and unversioned, so it is imported here
+    rather than at module level; if it is missing or its interface changed,
+    this falls back to the public ripser() call.
+    """
+    thresh = np.inf if threshold is None else threshold
+
+    def public_ripser() -> list[np.ndarray]:
+        return ripser(
+            distance_matrix, maxdim=max_dim, thresh=thresh, distance_matrix=True
+        )["dgms"]
+
+    if np.any(np.diagonal(distance_matrix) != 0):
+        return public_ripser()
+
+    try:
+        from pyRipser import doRipsFiltrationDM  # ripser's C++ core
+    except ImportError:
+        return public_ripser()
+
+    condensed = np.ascontiguousarray(squareform(distance_matrix, checks=False))
+    try:
+        res = doRipsFiltrationDM(condensed, max_dim, thresh, 2, False)
+        dgms = res["births_and_deaths_by_dim"]
+    except (TypeError, KeyError):
+        return public_ripser()
+    return [np.reshape(np.array(dgm), (-1, 2)) for dgm in dgms]
+
+
+def _ripser_collapsed(
+    distance_matrix: np.ndarray,
+    max_dim: int,
+    threshold: float,
+    n_perm: int | None,
+) -> list[np.ndarray]:
+    """
+    Ripser diagrams of the edge-collapsed threshold graph.
+
+    Edge collapse (Boissonnat & Pritam 2020, via GUDHI's reduce_graph)
+    drops edges whose removal leaves the persistent homology of the flag
+    filtration unchanged; on dense Gower matrices this removes most edges
+    below the threshold, which is what makes H₂ expensive for Ripser.
+    n_perm picks the same greedy permutation subsample as ripser().
+    """
+    from gudhi.flag_filtration.edge_collapse import reduce_graph
+
+    if n_perm is not None:
+        idx = _farthest_point_sample(distance_matrix, n_perm)
+        distance_matrix = distance_matrix[np.ix_(idx, idx)]
+
+    n = distance_matrix.shape[0]
+    rows, cols = np.nonzero(np.triu(distance_matrix <= threshold, k=1))
+    graph = sp.coo_matrix((distance_matrix[rows, cols], (rows, cols)), shape=(n, n))
+    return ripser(
+        reduce_graph(graph), maxdim=max_dim, thresh=threshold, distance_matrix=True
+    )["dgms"]
+
+
+def _persistence_stats(lifespans: np.ndarray) -> dict:
+    """
+    Summary statistics of finite persistence lifespans.
+
+    Quartiles come from one quantile call, the mean is reused for the
+    standard deviation, and the entropy is a single entr() kernel, so the
+    array is traversed a handful of times rather than once per statistic.
+    """
+    n = len(lifespans)
+    if n == 0:
+        return {"count": 0}
+
+    mean = float(lifespans.sum()) / n
+    centered = lifespans - mean
+    q25, median, q75 = np.quantile(lifespans, [0.25, 0.5, 0.75])
+    normed = lifespans / (lifespans.sum() + 1e-10)
+
+    return {
+        "count": int(n),
+        "mean_lifespan": mean,
+        "std_lifespan": float(np.sqrt(np.dot(centered, centered) / n)),
+        "median_lifespan": float(median),
+        "max_lifespan": float(lifespans.max()),
+        "iqr_lifespan": float(q75 - q25),
+        "entropy": float(entr(normed).sum()),
+    }
+
+
 def compute_persistence_scaled(
     distance_matrix: np.ndarray,
     max_dim: int = 2,
@@ -97,7 +194,8 @@ def compute_persistence_scaled(
     <3,000 venues:  Direct Ripser, H₀–H₂, no approximation
     3K–10K:         Ripser + threshold + edge collapse for H₂
     10K–50K:        GUDHI sparse Rips (ε=0.3) for O(n)-size complex
-    50K+:           Multiple subsampling (Cao & Rabadán, arXiv:2204.09155)
+    50K+:           Multiple farthest-point subsamples (Cao & Rabadán,
+                    arXiv:2204.09155)
 
     Args:
         distance_matrix: N×N distance matrix
@@ -112,12 +210,16 @@ def compute_persistence_scaled(
         return compute_persistence(distance_matrix, max_dim=max_dim, threshold=0.8)
 
     elif n <= 10000:
-        # Threshold + subsample for H₂
+        # Threshold + subsample + edge collapse for H₂
         result_h01 = compute_persistence(
             distance_matrix, max_dim=1, threshold=0.8
         )
         result_h2 = compute_persistence(
-            distance_matrix, max_dim=2, threshold=0.5, n_perm=min(n, 2000)
+            distance_matrix,
+            max_dim=2,
+            threshold=0.5,
+            n_perm=min(n, 2000),
+            edge_collapse=True,
         )
         result_h01["diagrams"]["H2"] = result_h2["diagrams"]["H2"]
         result_h01["stats"]["H2"] = result_h2["stats"]["H2"]
@@ -130,7 +232,7 @@ def compute_persistence_scaled(
     else:
         # Multiple subsampling
         return _multi_subsample_persistence(
-            distance_matrix, max_dim, subsample_size=2000, num_subsamples=20
+            distance_matrix, max_dim, subsample_size=2000, num_subsamples=5
         )
 
 
@@ -140,6 +242,8 @@ def _gudhi_sparse_persistence(
     """GUDHI sparse Rips computation for medium-large datasets (10K-50K)."""
     import gudhi
 
+    # No float32 downcast here: GUDHI's Rips works in double internally, and
+    # for a float64 10K-50K input the cast would copy the whole N² matrix
     rips = gudhi.RipsComplex(distance_matrix=distance_matrix, sparse=0.3)
     st = rips.create_simplex_tree(max_dimension=max_dim + 1)
     st.compute_persistence()
@@ -160,22 +264,7 @@ def _gudhi_sparse_persistence(
         finite = intervals[np.isfinite(intervals[:, 1])]
         lifespans = finite[:, 1] - finite[:, 0] if len(finite) > 0 else np.array([])
 
-        if len(lifespans) > 0:
-            normed = lifespans / (lifespans.sum() + 1e-10)
-            entropy = float(-np.sum(normed * np.log(normed + 1e-10)))
-            stats[key] = {
-                "count": int(len(lifespans)),
-                "mean_lifespan": float(np.mean(lifespans)),
-                "std_lifespan": float(np.std(lifespans)),
-                "median_lifespan": float(np.median(lifespans)),
-                "max_lifespan": float(np.max(lifespans)),
-                "iqr_lifespan": float(
-                    np.percentile(lifespans, 75) - np.percentile(lifespans, 25)
-                ),
-                "entropy": entropy,
-            }
-        else:
-            stats[key] = {"count": 0}
+        stats[key] = _persistence_stats(lifespans)
 
     return {
         "diagrams": diagrams,
@@ -189,19 +278,40 @@ def _multi_subsample_persistence(
     max_dim: int,
     subsample_size: int = 2000,
     num_subsamples: int = 20,
+    seed: int = 0,
 ) -> dict:
     """
     Multiple subsampling strategy for very large datasets (50K+).
-    Draw K random subsamples, compute PH on each, aggregate statistics.
+    Draw K subsamples, compute PH on each, aggregate statistics.
+
+    Each subsample is a greedy farthest-point (maxmin) sample from a random
+    seed point, as in Ripser's n_perm. These cover the data far more evenly
+    than uniform draws, so fewer subsamples give stable H₁/H₂ statistics.
+
+    Subsamples are independent, so they run in parallel worker processes
+    (Ripser holds the GIL, so threads would not help). Submatrices are
+    sliced lazily as workers free up, so only a few are alive at a time;
+    seeding makes the draw reproducible.
     """
+    from joblib import Parallel, delayed
+
     n = distance_matrix.shape[0]
     all_stats: dict[str, list] = {f"H{d}": [] for d in range(max_dim + 1)}
 
-    for _ in range(num_subsamples):
-        indices = np.random.choice(n, size=min(subsample_size, n), replace=False)
-        sub_matrix = distance_matrix[np.ix_(indices, indices)]
-        result = compute_persistence(sub_matrix, max_dim=max_dim, threshold=0.8)
+    rng = np.random.default_rng(seed)
+
+    def subsamples():
+        for _ in range(num_subsamples):
+            start = int(rng.integers(n))
+            indices = _farthest_point_sample(distance_matrix, subsample_size, start)
+            yield distance_matrix[np.ix_(indices, indices)]
+
+    results = Parallel(n_jobs=-1)(
+        delayed(compute_persistence)(sub_matrix, max_dim=max_dim, threshold=0.8)
+        for sub_matrix in subsamples()
+    )
 
+    for result in results:
         for dim in range(max_dim + 1):
             key = f"H{dim}"
             if result["stats"][key]["count"] > 0:
@@ -241,3 +351,30 @@ def _multi_subsample_persistence(
         "num_points": int(n),
         "method": "multi_subsample",
     }
+
+
+def _farthest_point_sample(
+    distance_matrix: np.ndarray,
+    k: int,
+    start: int = 0,
+) -> np.ndarray:
+    """
+    Greedy farthest-point subsample: repeatedly add the point farthest from
+    those already chosen, starting from `start`.
+
+    Returns:
+        (min(k, N),) indices into distance_matrix
+    """
+    k = min(k, distance_matrix.shape[0])
+    indices = np.empty(k, dtype=np.intp)
+    indices[0] = start
+    min_dist = np.array(distance_matrix[start], dtype=np.float64)
+    min_dist[start] = -np.inf
+
+    for i in range(1, k):
+        nxt = int(np.argmax(min_dist))
+        indices[i] = nxt
+        np.minimum(min_dist, distance_matrix[nxt], out=min_dist)
+        min_dist[nxt] = -np.inf
+
+    return indices
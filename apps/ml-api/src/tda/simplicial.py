@@ -16,9 +16,12 @@ Simplices:
 """
 
 import numpy as np
+import scipy.sparse as sp
 from collections import defaultdict
 from itertools import combinations
 
+from ..jit import HAS_NUMBA, njit
+
 
 def build_booking_simplicial_complex(bookings: list[dict]) -> dict:
     """
@@ -27,48 +30,45 @@ def build_booking_simplicial_complex(bookings: list[dict]) -> dict:
     Each booking is a dict with keys:
         venue_id, event_id, vendor_ids (list), timeslot_id
 
-    The downward closure property holds naturally: if a 4-way booking
-    exists, all subset relationships must also exist.
+    Each vendor on a booking forms a 4-way (venue, event, timeslot,
+    vendor) simplex; vendors are not related to each other directly. The
+    downward closure property holds naturally: if a 4-way booking exists,
+    all subset relationships must also exist.
 
     Returns:
         simplices: dict mapping dimension to list of simplices
         betti_numbers: Betti numbers β₀, β₁, β₂
         hodge_analysis: gradient/curl/harmonic decomposition info
     """
-    # Collect all entities with type prefixes for uniqueness
+    # Collect all entities with type prefixes for uniqueness. Simplices are
+    # deduplicated on insertion: combinations of a sorted clique are
+    # already in canonical (sorted) order.
     entities: set[str] = set()
-    simplices_by_dim: dict[int, list[tuple]] = defaultdict(list)
+    simplices_by_dim: dict[int, set[tuple]] = defaultdict(set)
 
     for booking in bookings:
         venue = f"venue:{booking['venue_id']}"
         event = f"event:{booking['event_id']}"
         timeslot = f"timeslot:{booking.get('timeslot_id', 'default')}"
         vendor_ids = booking.get("vendor_ids", [])
-        vendors = [f"vendor:{vid}" for vid in vendor_ids]
+        vendors = tuple(f"vendor:{vid}" for vid in vendor_ids)
 
         # 0-simplices (vertices)
-        all_entities = [venue, event, timeslot] + vendors
-        for e in all_entities:
-            entities.add(e)
-
-        # 1-simplices (edges): all pairwise relationships
-        pairs = list(combinations(all_entities, 2))
-        simplices_by_dim[1].extend(pairs)
-
-        # 2-simplices (triangles): all triples
-        triples = list(combinations(all_entities, 3))
-        simplices_by_dim[2].extend(triples)
-
-        # 3-simplices (tetrahedra): venue-event-vendor-timeslot quads
-        if len(all_entities) >= 4:
-            quads = list(combinations(all_entities, 4))
-            simplices_by_dim[3].extend(quads)
-
-    # Deduplicate simplices (sort tuples for canonical form)
-    for dim in simplices_by_dim:
-        simplices_by_dim[dim] = list(
-            set(tuple(sorted(s)) for s in simplices_by_dim[dim])
-        )
+        base = (venue, event, timeslot)
+        entities.update(base, vendors)
+
+        # Maximal simplices: one venue-event-timeslot-vendor quad per vendor
+        # (the venue-event-timeslot triangle if there are none). Vendors on
+        # the same booking meet through that shared triangle, so a booking
+        # with k vendors yields O(k) simplices rather than C(k+3, 4).
+        cliques = [sorted((*base, vendor)) for vendor in vendors] or [sorted(base)]
+        for clique in cliques:
+            # 1-simplices (edges), 2-simplices (triangles) and
+            # 3-simplices (tetrahedra): the clique's downward closure
+            for dim in range(1, len(clique)):
+                simplices_by_dim[dim].update(combinations(clique, dim + 1))
+
+    simplices_by_dim = {dim: list(simps) for dim, simps in simplices_by_dim.items()}
 
     # 0-simplices
     simplices_by_dim[0] = [(e,) for e in entities]
@@ -123,28 +123,43 @@ def analyze_vendor_venue_affinities(bookings: list[dict]) -> dict:
     if not venues or not vendors:
         return {"affinities": [], "patterns": []}
 
-    # Build affinity matrix
-    affinity_matrix = np.zeros((len(venues), len(vendors)))
-    for i, v in enumerate(venues):
-        for j, vd in enumerate(vendors):
-            affinity_matrix[i, j] = venue_vendor_counts.get((v, vd), 0)
-
-    # Normalize by row (venue) totals
-    row_sums = affinity_matrix.sum(axis=1, keepdims=True)
-    row_sums[row_sums == 0] = 1.0
-    normalized = affinity_matrix / row_sums
-
-    # Top affinities
-    affinities = []
-    for i, venue in enumerate(venues):
-        for j, vendor in enumerate(vendors):
-            if normalized[i, j] > 0.1:  # >10% of bookings
-                affinities.append({
-                    "venue_id": venue,
-                    "vendor_id": vendor,
-                    "affinity_score": float(normalized[i, j]),
-                    "booking_count": int(affinity_matrix[i, j]),
-                })
+    # Sparse affinity matrix straight from the co-occurrence counts
+    venue_idx = {v: i for i, v in enumerate(venues)}
+    vendor_idx = {vd: j for j, vd in enumerate(vendors)}
+    n_pairs = len(venue_vendor_counts)
+    rows = np.fromiter(
+        (venue_idx[v] for v, _ in venue_vendor_counts), dtype=np.int64, count=n_pairs
+    )
+    cols = np.fromiter(
+        (vendor_idx[vd] for _, vd in venue_vendor_counts), dtype=np.int64, count=n_pairs
+    )
+    data = np.fromiter(venue_vendor_counts.values(), dtype=np.float64, count=n_pairs)
+    affinity_matrix = sp.coo_matrix(
+        (data, (rows, cols)), shape=(len(venues), len(vendors))
+    ).tocsr()
+    affinity_matrix.sort_indices()
+
+    # Normalize by row (venue) totals, on the stored entries only
+    row_sums = np.asarray(affinity_matrix.sum(axis=1)).ravel()
+    row_of = np.repeat(np.arange(len(venues)), np.diff(affinity_matrix.indptr))
+    normalized = affinity_matrix.data / np.maximum(row_sums, 1.0)[row_of]
+
+    # Top affinities, in (venue, vendor) order
+    keep = normalized > 0.1  # >10% of bookings
+    affinities = [
+        {
+            "venue_id": venues[i],
+            "vendor_id": vendors[j],
+            "affinity_score": float(score),
+            "booking_count": int(count),
+        }
+        for i, j, score, count in zip(
+            row_of[keep],
+            affinity_matrix.indices[keep],
+            normalized[keep],
+            affinity_matrix.data[keep],
+        )
+    ]
 
     affinities.sort(key=lambda x: x["affinity_score"], reverse=True)
 
@@ -152,7 +167,7 @@ def analyze_vendor_venue_affinities(bookings: list[dict]) -> dict:
         "affinities": affinities[:50],  # Top 50
         "num_venues": len(venues),
         "num_vendors": len(vendors),
-        "density": float(np.count_nonzero(affinity_matrix) / affinity_matrix.size),
+        "density": float(affinity_matrix.nnz / (len(venues) * len(vendors))),
     }
 
 
@@ -175,27 +190,22 @@ def _compute_betti_numbers(simplices_by_dim: dict[int, list[tuple]]) -> dict:
 
         # For β₀: count connected components
         if k == 0:
-            # Use union-find on 1-simplices
-            vertices = {s[0] for s in k_simplices}
-            edges = simplices_by_dim.get(1, [])
-            parent: dict[str, str] = {v: v for v in vertices}
-
-            def find(x: str) -> str:
-                while parent[x] != x:
-                    parent[x] = parent[parent[x]]
-                    x = parent[x]
-                return x
-
-            def union(a: str, b: str) -> None:
-                ra, rb = find(a), find(b)
-                if ra != rb:
-                    parent[ra] = rb
-
-            for edge in edges:
-                if len(edge) == 2:
-                    union(edge[0], edge[1])
-
-            components = len(set(find(v) for v in vertices))
+            # Union-find on 1-simplices, over contiguous int vertex IDs
+            id_of = {s[0]: i for i, s in enumerate(k_simplices)}
+            edges = [e for e in simplices_by_dim.get(1, []) if len(e) == 2]
+            n_edges = len(edges)
+            src = np.fromiter((id_of[e[0]] for e in edges), dtype=np.int32, count=n_edges)
+            dst = np.fromiter((id_of[e[1]] for e in edges), dtype=np.int32, count=n_edges)
+
+            if HAS_NUMBA:
+                components = int(_union_find_components(len(id_of), src, dst))
+            else:
+                from scipy.sparse import coo_matrix
+                from scipy.sparse.csgraph import connected_components
+
+                n = len(id_of)
+                graph = coo_matrix((np.ones(n_edges), (src, dst)), shape=(n, n))
+                components = int(connected_components(graph, directed=False)[0])
             betti[key] = components
         else:
             # For higher Betti numbers, use rank formula
@@ -211,6 +221,34 @@ def _compute_betti_numbers(simplices_by_dim: dict[int, list[tuple]]) -> dict:
     return betti
 
 
+@njit(cache=True)
+def _union_find_components(n: int, src: np.ndarray, dst: np.ndarray) -> int:
+    """Connected components of an n-vertex graph (union by rank, path halving)."""
+    parent = np.arange(n, dtype=np.int32)
+    rank = np.zeros(n, dtype=np.int8)
+    components = n
+
+    for e in range(src.shape[0]):
+        a = src[e]
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        b = dst[e]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a == b:
+            continue
+        if rank[a] < rank[b]:
+            a, b = b, a
+        parent[b] = a
+        if rank[a] == rank[b]:
+            rank[a] += 1
+        components -= 1
+
+    return components
+
+
 def _hodge_analysis_simplified(
     simplices_by_dim: dict[int, list[tuple]],
     bookings: list[dict],
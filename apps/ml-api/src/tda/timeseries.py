@@ -11,8 +11,20 @@ Key papers:
 - Rivera-Castro et al. 2020, "TDA for hospitality demand forecasting" (arXiv:2009.03661)
 """
 
+from functools import lru_cache
+
 import numpy as np
 from ripser import ripser
+from scipy.linalg import solve_triangular
+from scipy.spatial.distance import pdist, squareform
+
+# Working-set budget for blocked batch computations (a typical per-core L2)
+_L2_CACHE_BYTES = 1 << 20
+
+# Working precision of the series and correlation pipelines. Ripser rounds
+# distances to float32 anyway, and booking features need ~1e-5 at most;
+# float32 halves memory traffic and doubles SIMD width in the batched matmuls
+_DTYPE = np.float32
 
 
 def takens_embedding(
@@ -36,8 +48,10 @@ def takens_embedding(
         dimension: d — embedding dimension (typically 2 or 3)
 
     Returns:
-        Point cloud as (N, dimension) array
+        Point cloud as (N, dimension) float32 array. This is a read-only
+        strided view into time_series (no copy) when it is already float32.
     """
+    time_series = np.asarray(time_series, dtype=_DTYPE)
     n = len(time_series)
     num_points = n - (dimension - 1) * delay
     if num_points <= 0:
@@ -45,10 +59,10 @@ def takens_embedding(
             f"Time series too short ({n}) for delay={delay}, dim={dimension}"
         )
 
-    embedded = np.zeros((num_points, dimension))
-    for i in range(dimension):
-        embedded[:, i] = time_series[i * delay: i * delay + num_points]
-    return embedded
+    # Row t is the window x[t : t + (d-1)τ + 1] sampled every τ steps
+    window_len = (dimension - 1) * delay + 1
+    windows = np.lib.stride_tricks.sliding_window_view(time_series, window_len)
+    return windows[:, ::delay]
 
 
 def detect_periodicity_sw1pers(
@@ -70,24 +84,40 @@ def detect_periodicity_sw1pers(
 
     Returns:
         Ranked periodicities with confidence scores
+
+    Results are LRU-cached on the series values and candidate periods, so
+    repeated scans of the same series skip the embeddings and Ripser.
     """
     if window_sizes is None:
         window_sizes = [7, 14, 30, 90, 365]
 
+    # ndarrays are not hashable; their float32 bytes (values and length)
+    # are, and unlike id() cannot go stale when an array is reused
+    series = np.ascontiguousarray(time_series, dtype=_DTYPE).tobytes()
+    results = _periodicity_cached(series, tuple(window_sizes))
+    return [dict(result) for result in results]
+
+
+@lru_cache(maxsize=32)
+def _periodicity_cached(series: bytes, window_sizes: tuple[int, ...]) -> tuple[dict, ...]:
+    """detect_periodicity_sw1pers on a float32 series given as bytes."""
+    time_series = np.frombuffer(series, dtype=_DTYPE)
+
     # Normalize to [0, 1]
     ts_min, ts_max = time_series.min(), time_series.max()
     ts = (time_series - ts_min) / (ts_max - ts_min + 1e-10)
 
-    results = []
-    for window in window_sizes:
-        if len(ts) < 3 * window:
-            continue
-
-        # Takens embedding with delay = window
-        cloud = takens_embedding(ts, delay=window, dimension=2)
+    # Takens embedding with delay = window, and its H₁ persistence. This runs
+    # serially: the API offloads the whole scan to its process pool, and a
+    # nested per-window process fan-out cost as much to start as it saved
+    windows = [window for window in window_sizes if len(ts) >= 3 * window]
+    dgms = [
+        _h1_diagram(takens_embedding(ts, delay=window, dimension=2))
+        for window in windows
+    ]
 
-        # Compute H₁ persistence
-        dgm = ripser(cloud, maxdim=1)["dgms"][1]
+    results = []
+    for window, dgm in zip(windows, dgms):
         if len(dgm) == 0:
             results.append({
                 "period_days": window,
@@ -111,7 +141,7 @@ def detect_periodicity_sw1pers(
             "label": _period_label(window),
         })
 
-    return sorted(results, key=lambda r: r["persistence"], reverse=True)
+    return tuple(sorted(results, key=lambda r: r["persistence"], reverse=True))
 
 
 def detect_regime_changes(
@@ -136,46 +166,35 @@ def detect_regime_changes(
     Returns:
         List of detected change points with severity scores
     """
-    norms: list[float] = []
-    positions: list[int] = []
+    time_series = np.asarray(time_series, dtype=_DTYPE)
+    starts = np.arange(0, len(time_series) - window_size, step)
+    positions = starts + window_size // 2
+    norms_arr = np.zeros(len(starts))
 
-    for start in range(0, len(time_series) - window_size, step):
-        window = time_series[start: start + window_size]
-
-        # Normalize window
-        w_min, w_max = window.min(), window.max()
-        if w_max - w_min < 1e-10:
-            norms.append(0.0)
-            positions.append(start + window_size // 2)
-            continue
-
-        w_norm = (window - w_min) / (w_max - w_min)
-
-        delay = max(1, window_size // 7)
-        try:
-            cloud = takens_embedding(w_norm, delay=delay, dimension=2)
-        except ValueError:
-            norms.append(0.0)
-            positions.append(start + window_size // 2)
-            continue
-
-        dgm = ripser(cloud, maxdim=1)["dgms"][1]
-        if len(dgm) == 0:
-            norms.append(0.0)
-        else:
-            # Use sum of squared lifespans as a proxy for landscape L² norm
-            # (avoids persim dependency for PersistenceLandscapeExact)
-            lifespans = dgm[:, 1] - dgm[:, 0]
-            lifespans = lifespans[np.isfinite(lifespans)]
-            norms.append(float(np.sum(lifespans ** 2)))
-
-        positions.append(start + window_size // 2)
-
-    norms_arr = np.array(norms)
-
-    if len(norms_arr) < 3:
+    if len(starts) < 3:
         return []
 
+    # Min-max normalize every window at once over a strided (W, window) view
+    windows = np.lib.stride_tricks.sliding_window_view(time_series, window_size)
+    windows = windows[: len(time_series) - window_size: step]
+    w_min = windows.min(axis=1, keepdims=True)
+    w_range = windows.max(axis=1, keepdims=True) - w_min
+    flat = w_range[:, 0] < 1e-10
+    w_norm = (windows - w_min) / np.where(flat[:, None], 1.0, w_range)
+
+    # Flat windows, and windows too short to embed, keep a zero norm; the
+    # rest are embedded and run through Ripser
+    delay = max(1, window_size // 7)
+    if window_size > delay:
+        for i in np.flatnonzero(~flat):
+            dgm = _h1_diagram(takens_embedding(w_norm[i], delay=delay, dimension=2))
+            if len(dgm) > 0:
+                # Use sum of squared lifespans as a proxy for landscape L² norm
+                # (avoids persim dependency for PersistenceLandscapeExact)
+                lifespans = dgm[:, 1] - dgm[:, 0]
+                lifespans = lifespans[np.isfinite(lifespans)]
+                norms_arr[i] = float(np.sum(lifespans ** 2))
+
     # Detect change points: where the norm changes significantly
     diff = np.abs(np.diff(norms_arr))
     threshold = np.mean(diff) + 2 * np.std(diff)  # 2-sigma outliers
@@ -229,75 +248,156 @@ def detect_anomalies_tada(
 
     # Stack channels into matrix (T, n_channels)
     T = min(len(v) for v in booking_channels.values())
-    data = np.column_stack([booking_channels[name][:T] for name in channel_names])
-
-    # Compute PH for each sliding window
-    topo_features: list[np.ndarray] = []
-    positions: list[int] = []
+    data = np.column_stack(
+        [booking_channels[name][:T] for name in channel_names]
+    ).astype(_DTYPE, copy=False)
 
-    for start in range(0, T - window_size, step):
-        window = data[start: start + window_size]
-
-        # Correlation distance matrix between channels
-        corr = np.corrcoef(window.T)
-        dist = 1.0 - np.abs(corr)
-        np.fill_diagonal(dist, 0.0)
-
-        # Compute H₀ persistence (cluster structure of channels)
-        dgm = ripser(dist, maxdim=0, distance_matrix=True)["dgms"][0]
-        lifespans = dgm[:, 1] - dgm[:, 0]
-        lifespans = lifespans[np.isfinite(lifespans)]
-
-        if len(lifespans) > 0:
-            features = np.array([
-                float(np.mean(lifespans)),
-                float(np.std(lifespans)),
-                float(np.max(lifespans)),
-                float(len(lifespans)),
-            ])
-        else:
-            features = np.zeros(4)
-
-        topo_features.append(features)
-        positions.append(start + window_size // 2)
-
-    if len(topo_features) < 10:
+    starts = np.arange(0, T - window_size, step)
+    positions = starts + window_size // 2
+    if len(starts) < 10:
         return []
 
-    features_matrix = np.vstack(topo_features)
-
-    # Compute "normal" distribution (mean + covariance)
-    mean = np.mean(features_matrix, axis=0)
-    cov = np.cov(features_matrix.T)
+    # Correlation distance matrix between channels for every sliding window
+    # at once: center a strided (W, channels, window) view and form all
+    # covariance matrices in one batched matmul, then scale as np.corrcoef
+    # does (constant channels give NaN)
+    windows = np.lib.stride_tricks.sliding_window_view(data, window_size, axis=0)
+    windows = windows[: T - window_size: step]
+
+    # Windows where a channel is constant have no correlation structure and
+    # get all-zero features. Tested exactly (max == min): after centering,
+    # rounding leaves a constant channel a tiny nonzero variance, which
+    # would turn its correlations into noise rather than NaN
+    degenerate = (windows.max(axis=2) == windows.min(axis=2)).any(axis=1)
+    valid = np.flatnonzero(~degenerate)
+
+    # Blocks of windows sized so each centered block stays in L2 cache
+    n_windows = len(windows)
+    block = max(1, _L2_CACHE_BYTES // (data.itemsize * window_size * n_channels))
+    cov = np.empty((n_windows, n_channels, n_channels), dtype=_DTYPE)
+    for w0 in range(0, n_windows, block):
+        chunk = windows[w0: w0 + block]
+        centered = chunk - chunk.mean(axis=2, keepdims=True)
+        np.matmul(centered, centered.transpose(0, 2, 1), out=cov[w0: w0 + block])
+
+    cov = cov[valid]
+    stddev = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / stddev[:, :, None] / stddev[:, None, :]
+    np.clip(corr, -1.0, 1.0, out=corr)
+
+    dist = 1.0 - np.abs(corr)
+    dist[:, np.arange(n_channels), np.arange(n_channels)] = 0.0
+
+    # H₀ persistence (cluster structure of channels) of all valid windows
+    # at once
+    deaths = np.zeros((n_windows, max(n_channels - 1, 0)))
+    deaths[valid] = _h0_deaths_batched(dist)
+
+    # Lifespan features (mean, std, max, count) of every window at once.
+    # Non-bars are 0 in deaths, so windows without finite bars get all-zero
+    # features
+    finite = deaths > 0
+    counts = finite.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+    means = deaths.sum(axis=1) / safe_counts
+    centered = np.where(finite, deaths - means[:, None], 0.0)
+    stds = np.sqrt((centered * centered).sum(axis=1) / safe_counts)
+    features_matrix = np.column_stack(
+        [means, stds, deaths.max(axis=1, initial=0.0), counts]
+    )
+
+    # Compute "normal" distribution (mean + covariance), reusing the mean
+    # for the centered product
+    mean = features_matrix.mean(axis=0)
+    centered = features_matrix - mean
+    cov = centered.T @ centered / (len(features_matrix) - 1)
 
     # Handle singular covariance
     cov += np.eye(cov.shape[0]) * 1e-6
 
-    # Mahalanobis distance from normal
-    cov_inv = np.linalg.inv(cov)
-    anomalies = []
+    # Mahalanobis distance from normal for all windows at once: with
+    # cov = L·Lᵀ, d² = ‖L⁻¹(x - μ)‖², one triangular solve and no inverse
+    chol = np.linalg.cholesky(cov)
+    y = solve_triangular(chol, centered.T, lower=True)
+    mahas = np.sqrt(np.einsum("ij,ij->j", y, y))
 
-    for i, feat in enumerate(features_matrix):
-        diff = feat - mean
-        maha = float(np.sqrt(diff @ cov_inv @ diff))
-
-        # Flag if Mahalanobis > 3 (approximately 3-sigma outlier)
-        if maha > 3.0:
-            anomalies.append({
-                "position": int(positions[i]),
-                "mahalanobis_score": maha,
-                "severity": "high" if maha > 5.0 else "medium",
-                "feature_values": {
-                    "mean_lifespan": float(feat[0]),
-                    "std_lifespan": float(feat[1]),
-                    "max_lifespan": float(feat[2]),
-                    "num_components": int(feat[3]),
-                },
-            })
+    # Flag if Mahalanobis > 3 (approximately 3-sigma outlier)
+    anomalies = []
+    for i in np.flatnonzero(mahas > 3.0):
+        feat = features_matrix[i]
+        maha = float(mahas[i])
+        anomalies.append({
+            "position": int(positions[i]),
+            "mahalanobis_score": maha,
+            "severity": "high" if maha > 5.0 else "medium",
+            "feature_values": {
+                "mean_lifespan": float(feat[0]),
+                "std_lifespan": float(feat[1]),
+                "max_lifespan": float(feat[2]),
+                "num_components": int(feat[3]),
+            },
+        })
 
     return anomalies
 
 
+def _h1_diagram(cloud: np.ndarray) -> np.ndarray:
+    """
+    H₁ persistence diagram of a point cloud, Rips truncated at the
+    enclosing radius min_i max_j d(i, j).
+
+    Beyond the enclosing radius the Rips complex is a cone, so every H₁
+    class has died and the truncation leaves the diagram unchanged. The
+    distances are built once with pdist (float32, as Ripser uses) so the
+    threshold compares exactly against the values Ripser sees.
+    """
+    dist = squareform(pdist(cloud)).astype(np.float32)
+    enclosing_radius = float(dist.max(axis=1).min())
+    return ripser(
+        dist, maxdim=1, distance_matrix=True, thresh=enclosing_radius
+    )["dgms"][1]
+
+
+def _h0_deaths_batched(dist: np.ndarray) -> np.ndarray:
+    """
+    Finite H₀ death times of a batch of small distance matrices.
+
+    The H₀ bars of a Rips filtration are born at 0 and die at the edge
+    lengths of a minimum spanning tree, so Prim's algorithm gives the
+    diagram directly. It runs vectorized across the batch: c - 1 NumPy
+    steps for (W, c, c) input instead of W Ripser calls. Distances are
+    rounded to float32, as Ripser does. Matrices with NaN entries (from a
+    constant channel) have no finite bars.
+
+    Args:
+        dist: (W, c, c) symmetric distance matrices
+
+    Returns:
+        (W, c - 1) death times per matrix in ascending order; entries that
+        are not finite bars are 0 (as are zero-length bars)
+    """
+    dist = dist.astype(np.float32).astype(np.float64)
+    n_batch, c, _ = dist.shape
+    rows = np.arange(n_batch)
+
+    deaths = np.zeros((n_batch, max(c - 1, 0)))
+    in_tree = np.zeros((n_batch, c), dtype=bool)
+    in_tree[:, 0] = True
+    nearest = dist[:, 0, :].copy()
+
+    for k in range(c - 1):
+        candidates = np.where(in_tree, np.inf, nearest)
+        j = np.argmin(candidates, axis=1)
+        deaths[:, k] = candidates[rows, j]
+        in_tree[rows, j] = True
+        np.minimum(nearest, dist[rows, j], out=nearest)
+
+    deaths[np.isnan(dist).any(axis=(1, 2))] = 0.0
+    deaths.sort(axis=1)
+    return deaths
+
+
 def _period_label(days: int) -> str:
     """Convert a period in days to a human-readable label."""
     if days <= 7:
@@ -3,12 +3,23 @@ Persistence diagram and barcode visualization (TDA-1 supplementary).
 
 Generates matplotlib figures for persistence diagrams and barcodes.
 Returns base64-encoded PNG images for API responses.
+
+Figures are built with matplotlib.figure.Figure (Agg canvas) rather than
+pyplot: pyplot keeps every open figure in a global, non-thread-safe
+registry, which concurrent requests would share. Plots of empty diagrams
+(common when nothing clears the threshold) are rendered once per
+title/size and cached.
 """
 
+from functools import lru_cache
+
 import numpy as np
 import io
 import base64
 
+# Typical screen resolution; encode time and size scale with dpi²
+PNG_DPI = 96
+
 
 def persistence_diagram_to_png(
     diagrams: dict,
@@ -29,24 +40,32 @@ def persistence_diagram_to_png(
     Returns:
         Base64-encoded PNG string
     """
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
+    if _is_empty(diagrams):
+        return _empty_png(_render_persistence_diagram, title, tuple(figsize))
+    return _render_persistence_diagram(diagrams, title, figsize)
 
-    fig, ax = plt.subplots(figsize=figsize)
+
+def _render_persistence_diagram(diagrams: dict, title: str, figsize: tuple) -> str:
+    """Draw and encode persistence_diagram_to_png's figure."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
 
     colors = {"H0": "#1f77b4", "H1": "#ff7f0e", "H2": "#2ca02c"}
     labels = {"H0": "H₀ (clusters)", "H1": "H₁ (loops)", "H2": "H₂ (voids)"}
 
-    all_vals: list[float] = []
+    # One scatter per dimension: a uniform color keeps Agg on its fast
+    # (snapped) marker path, which per-point colors would leave. The
+    # diagonal's extent is a running min/max over the finite points
+    lo, hi = np.inf, -np.inf
     for dim in ["H0", "H1", "H2"]:
-        dgm = np.array(diagrams.get(dim, []))
+        dgm = np.asarray(diagrams.get(dim, []), dtype=np.float64)
         if len(dgm) == 0:
             continue
 
         finite_mask = np.isfinite(dgm[:, 1])
         finite = dgm[finite_mask]
-        infinite = dgm[~finite_mask]
 
         if len(finite) > 0:
             ax.scatter(
@@ -54,21 +73,20 @@ def persistence_diagram_to_png(
                 c=colors[dim], label=labels[dim],
                 s=30, alpha=0.7, edgecolors="black", linewidths=0.5,
             )
-            all_vals.extend(finite[:, 0].tolist())
-            all_vals.extend(finite[:, 1].tolist())
+            lo, hi = min(lo, finite.min()), max(hi, finite.max())
 
-        if len(infinite) > 0:
+        if len(finite) < len(dgm):
             # Plot infinite features as triangles at the top
-            max_val = max(all_vals) if all_vals else 1.0
+            max_val = hi if np.isfinite(hi) else 1.0
+            births = dgm[~finite_mask, 0]
             ax.scatter(
-                infinite[:, 0], [max_val * 1.1] * len(infinite),
+                births, np.full(len(births), max_val * 1.1),
                 c=colors[dim], marker="^", s=50, alpha=0.7,
                 edgecolors="black", linewidths=0.5,
             )
 
     # Diagonal line
-    if all_vals:
-        lo, hi = min(all_vals), max(all_vals)
+    if np.isfinite(lo):
         margin = (hi - lo) * 0.1
         ax.plot(
             [lo - margin, hi + margin], [lo - margin, hi + margin],
@@ -80,14 +98,9 @@ def persistence_diagram_to_png(
     ax.set_title(title)
     ax.legend(loc="lower right")
     ax.set_aspect("equal")
-    plt.tight_layout()
+    fig.tight_layout()
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150)
-    plt.close(fig)
-    buf.seek(0)
-
-    return base64.b64encode(buf.read()).decode("utf-8")
+    return _png_base64(fig)
 
 
 def barcode_to_png(
@@ -108,19 +121,30 @@ def barcode_to_png(
     Returns:
         Base64-encoded PNG string
     """
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
+    if _is_empty(diagrams):
+        return _empty_png(_render_barcode, title, tuple(figsize))
+    return _render_barcode(diagrams, title, figsize)
+
 
-    fig, ax = plt.subplots(figsize=figsize)
+def _render_barcode(diagrams: dict, title: str, figsize: tuple) -> str:
+    """Draw and encode barcode_to_png's figure."""
+    from matplotlib.collections import PolyCollection
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
 
     colors = {"H0": "#1f77b4", "H1": "#ff7f0e", "H2": "#2ca02c"}
     labels = {"H0": "H₀", "H1": "H₁", "H2": "H₂"}
 
-    y_pos = 0
-    y_ticks: list[float] = []
-    y_labels: list[str] = []
+    # All bars go into one PolyCollection (a single artist) rather than one
+    # barh Rectangle per feature
+    bars: list[np.ndarray] = []
+    bar_colors: list[str] = []
+    handles = []
 
+    y_pos = 0
     for dim in ["H0", "H1", "H2"]:
         dgm = np.array(diagrams.get(dim, []))
         if len(dgm) == 0:
@@ -128,33 +152,68 @@ def barcode_to_png(
 
         # Sort by birth time
         order = np.argsort(dgm[:, 0])
-        dgm = dgm[order]
-
-        first_in_group = True
-        for birth, death in dgm:
-            if not np.isfinite(death):
-                death = max(dgm[np.isfinite(dgm[:, 1]), 1].max() * 1.2, birth + 0.1) \
-                    if np.any(np.isfinite(dgm[:, 1])) else birth + 0.5
-
-            ax.barh(
-                y_pos, death - birth, left=birth,
-                height=0.6, color=colors[dim], alpha=0.7,
-                edgecolor="black", linewidth=0.5,
-                label=labels[dim] if first_in_group else None,
-            )
-            first_in_group = False
-            y_pos += 1
+        births, deaths = dgm[order, 0], dgm[order, 1]
+
+        finite = np.isfinite(deaths)
+        if finite.any():
+            capped = np.maximum(deaths[finite].max() * 1.2, births + 0.1)
+        else:
+            capped = births + 0.5
+        deaths = np.where(finite, deaths, capped)
+
+        # Rectangle corners (birth, y ± 0.3) → (death, y ± 0.3), bar height 0.6
+        ys = y_pos + np.arange(len(births))
+        lo, hi = ys - 0.3, ys + 0.3
+        bars.append(np.stack([
+            np.column_stack([births, lo]),
+            np.column_stack([births, hi]),
+            np.column_stack([deaths, hi]),
+            np.column_stack([deaths, lo]),
+        ], axis=1))
+        bar_colors.extend([colors[dim]] * len(births))
+        handles.append(Patch(
+            facecolor=colors[dim], alpha=0.7, edgecolor="black",
+            linewidth=0.5, label=labels[dim],
+        ))
+        y_pos += len(births)
+
+    if bars:
+        verts = np.concatenate(bars)
+        collection = PolyCollection(
+            verts, facecolors=bar_colors, alpha=0.7,
+            edgecolors="black", linewidths=0.5,
+        )
+        # As barh does, no autoscale margin to the left of the earliest birth
+        collection.sticky_edges.x.append(float(verts[:, 0, 0].min()))
+        ax.add_collection(collection)
+        ax.autoscale_view()
 
     ax.set_xlabel("Filtration Value")
     ax.set_ylabel("Features")
     ax.set_title(title)
-    ax.legend(loc="lower right")
+    ax.legend(handles=handles, loc="lower right")
     ax.invert_yaxis()
-    plt.tight_layout()
+    fig.tight_layout()
+
+    return _png_base64(fig)
+
+
+def _is_empty(diagrams: dict) -> bool:
+    """True if none of the plotted dimensions has a feature."""
+    return not any(len(diagrams.get(dim, [])) for dim in ("H0", "H1", "H2"))
+
+
+@lru_cache(maxsize=32)
+def _empty_png(render, title: str, figsize: tuple) -> str:
+    """Cached render of an empty diagram (axes, labels and title only)."""
+    return render({}, title, figsize)
+
 
+def _png_base64(fig) -> str:
+    """Render a figure to a base64-encoded PNG string."""
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150)
-    plt.close(fig)
-    buf.seek(0)
+    fig.savefig(buf, format="png", dpi=PNG_DPI)
 
-    return base64.b64encode(buf.read()).decode("utf-8")
+    # Encode straight from the buffer's memory (no bytes copy); base64
+    # output is pure ASCII
+    return base64.b64encode(buf.getbuffer()).decode("ascii")